@@ -0,0 +1,196 @@
+"""
+This file contains a batch entry point for enumerating cuts over a whole corpus of GraphML molecules in a process pool.
+
+Usage:
+    $ python src/batch.py data/example_molecules --algorithm vy --top-k 10 --workers 8 --output cuts.jsonl
+    $ python src/batch.py molecules.corpus --algorithm vy --top-k 10 --workers 8 --output cuts.jsonl
+"""
+import networkx as nx
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, TextIO
+import cut_bases  # has to be imported before varizani_yannakakis because of their circular import
+import varizani_yannakakis as vy
+import corpus
+import graphml_reader as gr
+from flow_network import FlowNetwork
+
+
+ALGORITHMS = ('vy', 'global', 'basis')
+READERS = ('networkx', 'stream')
+POOLS = ('process', 'thread')
+
+
+def find_molecules(sources: Iterable[str]) -> list[str]:
+    """
+    Expands directories (all *.graphml files inside) and glob patterns into a sorted list of GraphML files.
+    Binary corpus files (see corpus.py) are expanded into one 'path#k' entry per molecule.
+    """
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths += glob.glob(os.path.join(source, '*.graphml'))
+        else:
+            paths += glob.glob(source)
+
+    molecules = []
+    for path in sorted(set(paths)):
+        if not path.endswith('.graphml') and corpus.is_corpus(path):
+            molecules += [f'{path}#{k}' for k in range(len(corpus.open_corpus(path)))]
+        else:
+            molecules.append(path)
+
+    return molecules
+
+
+def load_molecule(path: str, capacity: str = 'order', reader: str = 'networkx') -> nx.Graph | FlowNetwork:
+    """
+    Reads a GraphML molecule (or molecule k of a corpus file given as 'path#k') and copies the edge attribute capacity
+    (the bond order by default) to 'capacity'; edges without it get an infinite capacity, as in the stream reader. The 'stream' reader returns a flow network without building a NetworkX graph.
+    """
+    if reader == 'stream':
+        return load_network(path, capacity)
+    if '#' in path:
+        corpus_path, k = path.rsplit('#', 1)
+        G = corpus.open_corpus(corpus_path).graph(int(k))
+    else:
+        G = nx.read_graphml(path)
+    if capacity != 'capacity':
+        for u, v, data in G.edges(data=True):
+            data['capacity'] = data.pop(capacity, math.inf)
+
+    return G
+
+
+def load_network(path: str, capacity: str = 'order') -> FlowNetwork:
+    """
+    Reads a GraphML molecule with the streaming reader (or molecule k of a corpus file given as 'path#k') as flow network.
+    """
+    if '#' not in path:
+        return gr.read_network(path, capacity)[0]
+
+    corpus_path, k = path.rsplit('#', 1)
+    molecules = corpus.open_corpus(corpus_path)
+    if molecules.capacity != capacity:
+        raise ValueError(f'{corpus_path} was packed with capacity {molecules.capacity!r}, not {capacity!r}')
+
+    return molecules.network(int(k))
+
+
+def solve_molecule(G: nx.Graph | FlowNetwork, algorithm: str = 'vy', top_k: int | None = None) -> list[tuple[vy.Cut_value, vy.ST_partition]]:
+    """
+    Runs the chosen algorithm on one molecule and returns its cuts as (value, ST-partition) tuples.
+    'vy' enumerates the top_k smallest cuts, 'global' returns the global min cut and 'basis' the greedy cut basis.
+    """
+    if algorithm == 'vy':
+        return [(cut.value, cut.st_partition) for cut in vy.iter_cuts(G, max_cuts=top_k)]
+    elif algorithm == 'global':
+        return [vy.global_min_cut(G if G.is_directed() else G.to_directed())]
+    elif algorithm == 'basis':
+        if not isinstance(G, nx.Graph):
+            raise ValueError('The greedy cut basis needs the edges of a NetworkX graph, use the networkx reader')
+        return [(cut.value, cut.st_partition) for cut in vy.varizani_yannakakis(G, greedy=True)[:top_k]]
+    else:
+        raise ValueError(f'Unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}')
+
+
+def process_molecule(path: str, algorithm: str = 'vy', top_k: int | None = None, capacity: str = 'order', reader: str = 'networkx') -> dict:
+    """
+    Loads and solves a single molecule file. Returns a JSON serializable record of the result, or if the molecule fails
+    (e.g. a malformed file) a record of the error, so that one molecule does not stop the run over a corpus.
+    Infinite cut values are written as null, since JSON has no infinity.
+    """
+    start = time.perf_counter()
+    try:
+        G = load_molecule(path, capacity, reader)
+        cuts = solve_molecule(G, algorithm, top_k)
+    except Exception as error:
+        return {'file': path, 'algorithm': algorithm, 'error': repr(error), 'seconds': time.perf_counter() - start}
+
+    return {
+        'file': path,
+        'nodes': G.number_of_nodes(),
+        'edges': G.number_of_edges(),
+        'algorithm': algorithm,
+        'cuts': [{'value': value if math.isfinite(value) else None, 'S': sorted(S), 'T': sorted(T)} for value, (S, T) in cuts],
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def iter_results(paths: list[str], algorithm: str = 'vy', top_k: int | None = None, capacity: str = 'order', reader: str = 'networkx', workers: int | None = None, pool: str = 'process') -> Iterator[dict]:
+    """
+    Yields one result record per molecule as soon as it is finished (not in input order if workers > 1).
+    At most a few molecules per worker are in flight at once, so the corpus size does not bound memory use.
+    With pool='thread' the molecules are solved in threads of this process, which avoids sending results between
+    processes but only runs in parallel on free-threaded Python builds.
+    """
+    if workers is None or workers <= 1:
+        for path in paths:
+            yield process_molecule(path, algorithm, top_k, capacity, reader)
+        return
+
+    with (ThreadPoolExecutor if pool == 'thread' else ProcessPoolExecutor)(workers) as executor:
+        paths = iter(paths)
+        pending = set()
+        while True:
+            for path in paths:
+                pending.add(executor.submit(process_molecule, path, algorithm, top_k, capacity, reader))
+                if len(pending) >= 4 * workers:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def run_batch(paths: list[str], output: TextIO, algorithm: str = 'vy', top_k: int | None = None, capacity: str = 'order', reader: str = 'networkx', workers: int | None = None, pool: str = 'process') -> dict:
+    """
+    Streams one JSON line per finished molecule to output and returns the throughput summary, which counts the
+    molecules that failed as errors.
+    """
+    start = time.perf_counter()
+    molecules = errors = 0
+    for result in iter_results(paths, algorithm, top_k, capacity, reader, workers, pool):
+        output.write(json.dumps(result, allow_nan=False) + '\n')
+        output.flush()
+        molecules += 1
+        errors += 'error' in result
+    seconds = time.perf_counter() - start
+
+    return {'molecules': molecules, 'errors': errors, 'seconds': seconds, 'molecules_per_second': molecules / seconds if seconds > 0 else 0.0}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Enumerate cuts over a corpus of GraphML molecules.')
+    parser.add_argument('sources', nargs='+', help='GraphML files, directories or glob patterns')
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS, default='vy', help='vy: cut enumeration, global: global min cut, basis: greedy cut basis')
+    parser.add_argument('-k', '--top-k', type=int, default=None, help='maximum number of cuts per molecule')
+    parser.add_argument('-c', '--capacity', default='order', help='edge attribute used as capacity')
+    parser.add_argument('-r', '--reader', choices=READERS, default='networkx', help='stream: read flow networks without NetworkX (not for basis)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='number of worker processes (or threads)')
+    parser.add_argument('-p', '--pool', choices=POOLS, default='process', help='thread: solve molecules in threads, for free-threaded Python builds')
+    parser.add_argument('-o', '--output', default='-', help='output file for JSON lines (default: stdout)')
+    args = parser.parse_args(argv)
+    if args.reader == 'stream' and args.algorithm == 'basis':
+        parser.error('the greedy cut basis needs the networkx reader')
+
+    paths = find_molecules(args.sources)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        summary = run_batch(paths, output, args.algorithm, args.top_k, args.capacity, args.reader, args.workers, args.pool)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"{summary['molecules']} molecules in {summary['seconds']:.2f} s ({summary['molecules_per_second']:.2f} molecules/s), {summary['errors']} errors", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+This file contains a reproducible benchmark of the flow engines over the example molecules, with JSON output.
+
+For every task (s-t max-flow, one-side-fixed min cut, global min cut, VY enumeration) every engine is timed on every
+molecule (best of --repeat runs, input preparation excluded). The enumeration task times the first --enumeration-cuts
+cuts of every molecule (1000 by default, 0 enumerates all cuts). The report holds median, percentiles and total time per
+engine, the log-log slope of the time against node and edge count, and the number of molecules on which an engine
+raised an error or disagreed with the reference engine of the task.
+
+Usage:
+    $ python src/benchmark.py data/example_molecules --limit 50 --repeat 3 --output benchmark.json
+    $ python src/benchmark.py data/example_molecules --task enumeration --enumeration-cuts 0
+"""
+import networkx as nx
+import numpy as np
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from networkx.algorithms.flow import edmonds_karp, minimum_cut
+from typing import Callable
+import cut_bases  # has to be imported before varizani_yannakakis because of their circular import
+import varizani_yannakakis as vy
+import push_relabel as pr
+import push_relabel_without_discharge as prwd
+import hao_orlin_original as ho
+import hao_orlin_diff as hod
+import hao_orlin_mittwoch as hom
+import batch
+from flow_network import FlowNetwork
+
+
+# Default number of cuts enumerated per molecule in the enumeration task, large enough that the time is dominated by
+# the expansion of children rather than by the global min cut
+ENUMERATION_CUTS = 1000
+
+# An engine is a pair of functions: setup(G, s, t) prepares a fresh input outside of the timing, run(input) returns the
+# value that is compared with the reference engine of the task (the first engine)
+type Engine = tuple[Callable, Callable]
+
+
+def _directed(G, s, t):
+    return G.to_directed()
+
+
+def _network(G, s, t):
+    return FlowNetwork.from_networkx(G)
+
+
+def enumeration_engines(max_cuts: int | None = ENUMERATION_CUTS) -> dict[str, Engine]:
+    """
+    Returns the engines of the enumeration task for the first max_cuts cuts of every molecule (all cuts if None).
+    """
+    return {
+        'edmonds_karp_sweep': (_directed, lambda D: [cut.value for cut in vy.iter_cuts(D, max_cuts=max_cuts, brute_force=True)]),
+        'hao_orlin': (_directed, lambda D: [cut.value for cut in vy.iter_cuts(D, max_cuts=max_cuts)]),
+        'hao_orlin_lazy': (_directed, lambda D: [cut.value for cut in vy.iter_cuts(D, max_cuts=max_cuts, lazy=True)]),
+    }
+
+
+ENGINES: dict[str, dict[str, Engine]] = {
+    'max_flow': {
+        'edmonds_karp': (lambda G, s, t: (G, s, t), lambda x: minimum_cut(*x, flow_func=edmonds_karp)[0]),
+        'push_relabel': (lambda G, s, t: (FlowNetwork.from_networkx(G), s, t), lambda x: pr.push_relabel(*x)[0]),
+        'push_relabel_highest_label': (lambda G, s, t: (FlowNetwork.from_networkx(G), s, t), lambda x: pr.push_relabel(*x, strategy='highest_label')[0]),
+        'push_relabel_lifo': (lambda G, s, t: (FlowNetwork.from_networkx(G), s, t), lambda x: pr.push_relabel(*x, strategy='lifo')[0]),
+        'push_relabel_gap_only': (lambda G, s, t: (FlowNetwork.from_networkx(G), s, t), lambda x: pr.push_relabel(*x, global_relabel_frequency=None)[0]),
+        'push_relabel_plain': (lambda G, s, t: (FlowNetwork.from_networkx(G), s, t), lambda x: pr.push_relabel(*x, gap=False, global_relabel_frequency=None)[0]),
+        'push_relabel_networkx': (lambda G, s, t: (G.to_directed(), s, t), lambda x: pr.push_relabel_directed(*x)[0]),
+        'push_relabel_without_discharge': (lambda G, s, t: (FlowNetwork.from_networkx(G), s, t), lambda x: prwd.push_relabel(*x)[0]),
+        'push_relabel_without_discharge_networkx': (lambda G, s, t: (G.to_directed(), s, t), lambda x: prwd.push_relabel_directed(*x)[0]),
+    },
+    'one_side_fixed_min_cut': {
+        'edmonds_karp_sweep': (lambda G, s, t: (G.to_directed(), s), lambda x: vy.minimum_s_cut(*x, brute_force=True)[0]),
+        'hao_orlin': (lambda G, s, t: (FlowNetwork.from_networkx(G), s), lambda x: ho.hao_orlin(*x)[0]),
+        'hao_orlin_networkx': (lambda G, s, t: (G.to_directed(), s), lambda x: ho.hao_orlin_directed(*x)[0]),
+        'hao_orlin_diff': (lambda G, s, t: (G.to_directed(), s), lambda x: hod.hao_orlin(*x)[0]),
+        'hao_orlin_mittwoch': (lambda G, s, t: (G.to_directed(), s), lambda x: hom.hao_orlin(*x)[0]),
+    },
+    'global_min_cut': {
+        'edmonds_karp_sweep': (_directed, lambda D: vy.global_min_cut(D, brute_force=True)[0]),
+        'hao_orlin': (_directed, lambda D: vy.global_min_cut(D)[0]),
+        'hao_orlin_network': (_network, lambda N: vy.global_min_cut(N)[0]),
+    },
+    'enumeration': enumeration_engines(),
+}
+
+
+def time_engine(engine: Engine, G: nx.Graph, s, t, repeat: int = 1) -> tuple[float, object]:
+    """
+    Returns the best wall time of repeat runs of an engine on G and the value of the last run.
+    Output of the engines (the debug prints of hao_orlin_diff) is discarded.
+    """
+    setup, run = engine
+    best = float('inf')
+    value = None
+    for _ in range(repeat):
+        data = setup(G, s, t)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            value = run(data)
+            best = min(best, time.perf_counter() - start)
+
+    return best, value
+
+
+def summarize(seconds: list[float], nodes: list[int], edges: list[int]) -> dict:
+    """
+    Returns median, percentiles and total of the timings, and the log-log slopes of time against node and edge count.
+    """
+    if not seconds:
+        return {'molecules': 0}
+    times = np.array(seconds)
+    summary = {
+        'molecules': len(seconds),
+        'total': float(times.sum()),
+        'mean': float(times.mean()),
+        'median': float(np.median(times)),
+        'p10': float(np.percentile(times, 10)),
+        'p90': float(np.percentile(times, 90)),
+        'p99': float(np.percentile(times, 99)),
+        'max': float(times.max()),
+    }
+    for key, sizes in (('nodes', nodes), ('edges', edges)):
+        sizes = np.array(sizes, dtype=float)
+        if len(set(sizes)) > 1 and times.min() > 0:
+            summary[f'{key}_exponent'] = float(np.polyfit(np.log(sizes), np.log(times), 1)[0])
+
+    return summary
+
+
+def run_benchmark(paths: list[str], tasks: list[str] | None = None, engines: list[str] | None = None, repeat: int = 1, capacity: str = 'order', per_molecule=False, enumeration_cuts: int | None = ENUMERATION_CUTS) -> dict:
+    """
+    Times the engines of the given tasks (all by default) on all molecules and returns the JSON serializable report.
+    The first engine of a task is the reference whose values the other engines are compared with. The enumeration task
+    enumerates enumeration_cuts cuts per molecule, or all cuts if it is None.
+    """
+    tasks = tasks or list(ENGINES)
+    molecules = []
+    for path in paths:
+        G = batch.load_molecule(path, capacity)
+        nodes = list(G.nodes)
+        molecules.append((path, G, nodes[0], nodes[-1]))
+
+    report = {'meta': _meta(repeat, capacity, len(molecules), enumeration_cuts), 'tasks': {}}
+    for task in tasks:
+        task_engines = enumeration_engines(enumeration_cuts) if task == 'enumeration' else ENGINES[task]
+        results = {}
+        reference = {}
+        reference_name = next(iter(task_engines))
+        for name, engine in task_engines.items():
+            if engines and name not in engines and name != reference_name:
+                continue
+            seconds, nodes, edges, records = [], [], [], []
+            errors = mismatches = 0
+            for path, G, s, t in molecules:
+                try:
+                    elapsed, value = time_engine(engine, G, s, t, repeat)
+                except Exception as error:
+                    errors += 1
+                    records.append({'file': path, 'error': repr(error)})
+                    continue
+                if name == reference_name:
+                    reference[path] = value
+                elif path in reference and not _same_value(value, reference[path]):
+                    mismatches += 1
+                seconds.append(elapsed)
+                nodes.append(G.number_of_nodes())
+                edges.append(G.number_of_edges())
+                records.append({'file': path, 'seconds': elapsed, 'value': value})
+
+            results[name] = summarize(seconds, nodes, edges) | {'errors': errors, 'mismatches': mismatches}
+            if per_molecule:
+                results[name]['per_molecule'] = records
+        report['tasks'][task] = results
+
+    return report
+
+
+def compare_reports(baseline: dict, report: dict) -> dict:
+    """
+    Returns the ratio of the median times of report and baseline (> 1 is slower) for every engine present in both.
+    """
+    ratios = {}
+    for task, results in report['tasks'].items():
+        for name, result in results.items():
+            old = baseline.get('tasks', {}).get(task, {}).get(name, {})
+            if old.get('median') and result.get('median'):
+                ratios.setdefault(task, {})[name] = result['median'] / old['median']
+
+    return ratios
+
+
+def _same_value(value, reference) -> bool:
+    return np.shape(value) == np.shape(reference) and bool(np.allclose(value, reference))
+
+
+def _meta(repeat: int, capacity: str, molecules: int, enumeration_cuts: int | None) -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'networkx': nx.__version__,
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'capacity': capacity,
+        'molecules': molecules,
+        'enumeration_cuts': enumeration_cuts,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Benchmark the flow engines over a corpus of GraphML molecules.')
+    parser.add_argument('sources', nargs='*', default=['data/example_molecules'], help='GraphML files, directories, glob patterns or corpus files')
+    parser.add_argument('-t', '--task', action='append', choices=list(ENGINES), help='task to benchmark (repeatable, default: all)')
+    parser.add_argument('-e', '--engine', action='append', help='engine to benchmark (repeatable, default: all; the reference engine always runs)')
+    parser.add_argument('-n', '--limit', type=int, default=None, help='benchmark only the first molecules')
+    parser.add_argument('-r', '--repeat', type=int, default=1, help='runs per molecule, the best one is taken')
+    parser.add_argument('-c', '--capacity', default='order', help='edge attribute used as capacity')
+    parser.add_argument('-k', '--enumeration-cuts', type=int, default=ENUMERATION_CUTS, help=f'cuts per molecule in the enumeration task, 0 for all cuts (default: {ENUMERATION_CUTS})')
+    parser.add_argument('--per-molecule', action='store_true', help='include the timing of every molecule')
+    parser.add_argument('--compare', help='JSON report of an earlier run, median ratios against it are added to the report')
+    parser.add_argument('-o', '--output', default='-', help='output file for the JSON report (default: stdout)')
+    args = parser.parse_args(argv)
+
+    paths = batch.find_molecules(args.sources)[:args.limit]
+    report = run_benchmark(paths, args.task, args.engine, args.repeat, args.capacity, args.per_molecule, args.enumeration_cuts or None)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        report['comparison'] = {'baseline_commit': baseline.get('meta', {}).get('commit'), 'median_ratio': compare_reports(baseline, report)}
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
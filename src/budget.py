@@ -0,0 +1,68 @@
+"""
+This file contains the deadline and cancellation token with which long enumerations and their flow engines are stopped.
+"""
+import math
+import threading
+import time
+
+
+class Cancelled(Exception):
+    """
+    Raised by Budget.check once the deadline has passed or the token has been cancelled.
+    """
+
+
+class CancelToken:
+    """
+    Flag for cooperative cancellation: another thread calls cancel() and the running enumeration stops at its next check.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class Budget:
+    """
+    Deadline (a time.monotonic() timestamp) and cancellation token of a run. Pass an instance as budget= to
+    push_relabel, hao_orlin or iter_cuts; they call check() between units of work (sink phases of Hao-Orlin, every
+    CHECK_INTERVAL discharges of push-relabel, cuts of the enumeration), which raises Cancelled once the budget is
+    used up.
+    """
+    # Number of push-relabel discharges between two checks, so that a check costs little compared to the work in between
+    CHECK_INTERVAL = 256
+
+    def __init__(self, deadline: float | None = None, token: CancelToken | None = None):
+        self.deadline = deadline
+        self.token = token
+
+    @classmethod
+    def create(cls, deadline: float | None = None, time_budget: float | None = None, token: CancelToken | None = None) -> 'Budget | None':
+        """
+        Returns the budget that ends at the deadline or after time_budget seconds from now, whichever comes first, or
+        None if neither a deadline, a time budget nor a token is given.
+        """
+        if deadline is None and time_budget is None and token is None:
+            return None
+        if time_budget is not None:
+            deadline = min(math.inf if deadline is None else deadline, time.monotonic() + time_budget)
+
+        return cls(deadline, token)
+
+    def expired(self) -> bool:
+        return self.token is not None and self.token.cancelled or self.deadline is not None and time.monotonic() >= self.deadline
+
+    def check(self):
+        if self.expired():
+            raise Cancelled('cancelled' if self.token is not None and self.token.cancelled else 'deadline exceeded')
+
+    def without_token(self) -> 'Budget':
+        """
+        Returns the budget with the deadline only, e.g. for worker processes to which the token cannot be sent.
+        """
+        return Budget(self.deadline)
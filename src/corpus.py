@@ -0,0 +1,292 @@
+"""
+This file contains a binary corpus format for molecule graphs that can be opened with numpy.memmap instead of parsing GraphML.
+
+Layout: the magic bytes b'CUTCORP1', the length of a JSON header as little-endian uint64, the JSON header and then a
+64-byte aligned data block with one 64-byte aligned array per section. The header stores dtype, shape and offset (into the
+data block) of every section:
+    names                   molecule names (file names of the packed GraphML files)
+    directed                1 for directed molecules
+    node_offsets            nodes of molecule k are node_offsets[k]:node_offsets[k + 1] (same for edge_ and arc_offsets)
+    labels                  node labels
+    node:<attribute>        node attribute columns (node_present:<attribute> if the attribute is missing on some nodes)
+    edges                   (u, v) pairs of local node ids
+    edge:<attribute>        edge attribute columns (edge_present:<attribute> if the attribute is missing on some edges)
+    csr_offsets             FlowNetwork offsets, molecule k uses csr_offsets[node_offsets[k] + k:node_offsets[k + 1] + k + 1]
+    heads, reverse          FlowNetwork arc arrays (local ids)
+    capacity                FlowNetwork arc capacities taken from the capacity attribute of the header
+
+Usage:
+    $ python src/corpus.py pack data/example_molecules molecules.corpus
+    $ python src/corpus.py unpack molecules.corpus out_dir
+"""
+import networkx as nx
+import numpy as np
+import argparse
+import json
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from flow_network import FlowNetwork
+
+
+MAGIC = b'CUTCORP1'
+ALIGNMENT = 64
+
+
+def read_molecule(path: str, capacity: str = 'order') -> dict:
+    """
+    Parses one GraphML file into the plain lists that are stored in a corpus.
+    """
+    G = nx.read_graphml(path)
+    N = FlowNetwork.from_networkx(G, capacity)
+    index = {label: i for i, label in enumerate(N.labels)}
+
+    return {
+        'name': os.path.basename(path),
+        'directed': G.is_directed(),
+        'labels': [str(label) for label in N.labels],
+        'node_attributes': [data for _, data in G.nodes(data=True)],
+        'edges': [(index[u], index[v]) for u, v in G.edges()],
+        'edge_attributes': [data for _, _, data in G.edges(data=True)],
+        'csr_offsets': N.offsets.tolist(),
+        'heads': N.heads.tolist(),
+        'reverse': N.reverse.tolist(),
+        'capacity': N.capacity.tolist(),
+    }
+
+
+def _strings(values: list[str]) -> np.ndarray:
+    encoded = [value.encode() for value in values]
+    return np.array(encoded, dtype=f'S{max(1, max(map(len, encoded), default=1))}')
+
+
+def _column(values: list) -> np.ndarray:
+    """
+    Stores attribute values with the narrowest common type of bool, int64, float64 or UTF-8 bytes.
+    """
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, bool) for value in present):
+        return np.array([bool(value) for value in values], dtype=bool)
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return np.array([value or 0 for value in values], dtype=np.int64)
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return np.array([value if value is not None else 0 for value in values], dtype=np.float64)
+
+    return _strings(['' if value is None else str(value) for value in values])
+
+
+def _attribute_sections(prefix: str, attributes: list[dict]) -> dict:
+    sections = {}
+    for key in sorted({key for data in attributes for key in data}):
+        values = [data.get(key) for data in attributes]
+        sections[f'{prefix}:{key}'] = _column(values)
+        if any(value is None for value in values):
+            sections[f'{prefix}_present:{key}'] = np.array([value is not None for value in values], dtype=bool)
+
+    return sections
+
+
+def pack_corpus(paths: list[str], output: str, capacity: str = 'order', workers: int | None = None) -> int:
+    """
+    Converts GraphML files into one binary corpus file. Returns the number of packed molecules.
+    """
+    if workers is None or workers <= 1:
+        molecules = [read_molecule(path, capacity) for path in paths]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            molecules = list(executor.map(read_molecule, paths, [capacity] * len(paths), chunksize=max(1, len(paths) // (4 * workers))))
+
+    def offsets(key):
+        return np.cumsum([0] + [len(molecule[key]) for molecule in molecules], dtype=np.int64)
+
+    sections = {
+        'names': _strings([molecule['name'] for molecule in molecules]),
+        'directed': np.array([molecule['directed'] for molecule in molecules], dtype=bool),
+        'node_offsets': offsets('labels'),
+        'edge_offsets': offsets('edges'),
+        'arc_offsets': offsets('heads'),
+        'labels': _strings([label for molecule in molecules for label in molecule['labels']]),
+        'edges': np.array([edge for molecule in molecules for edge in molecule['edges']], dtype=np.int64).reshape(-1, 2),
+        'csr_offsets': np.array([offset for molecule in molecules for offset in molecule['csr_offsets']], dtype=np.int64),
+        'heads': np.array([head for molecule in molecules for head in molecule['heads']], dtype=np.int64),
+        'reverse': np.array([arc for molecule in molecules for arc in molecule['reverse']], dtype=np.int64),
+        'capacity': np.array([c for molecule in molecules for c in molecule['capacity']], dtype=np.float64),
+    }
+    sections.update(_attribute_sections('node', [data for molecule in molecules for data in molecule['node_attributes']]))
+    sections.update(_attribute_sections('edge', [data for molecule in molecules for data in molecule['edge_attributes']]))
+
+    # Section offsets are relative to the data block, which starts at the first aligned position behind the header
+    header = {'version': 1, 'molecules': len(molecules), 'capacity': capacity, 'sections': {}}
+    position = 0
+    for key, data in sections.items():
+        position += -position % ALIGNMENT
+        header['sections'][key] = {'dtype': data.dtype.str, 'shape': list(data.shape), 'offset': position}
+        position += data.nbytes
+    encoded = json.dumps(header).encode()
+    data_start = _data_start(len(encoded))
+
+    with open(output, 'wb') as file:
+        file.write(MAGIC)
+        file.write(len(encoded).to_bytes(8, 'little'))
+        file.write(encoded)
+        for key, data in sections.items():
+            file.seek(data_start + header['sections'][key]['offset'])
+            file.write(np.ascontiguousarray(data).tobytes())
+
+    return len(molecules)
+
+
+def _data_start(header_length: int) -> int:
+    end = len(MAGIC) + 8 + header_length
+    return end + -end % ALIGNMENT
+
+
+def _to_array(typecode: str, data: np.ndarray) -> array:
+    converted = array(typecode)
+    kind = 'f' if typecode == 'd' else 'i'
+    converted.frombytes(np.ascontiguousarray(data, dtype=f'{kind}{converted.itemsize}').tobytes())
+    return converted
+
+
+class Corpus:
+    """
+    Read-only view of a binary corpus file. All sections are memory-mapped, so opening the corpus parses nothing but the
+    header and a molecule only touches the pages of its own slices.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a corpus file')
+            length = int.from_bytes(file.read(8), 'little')
+            self.header = json.loads(file.read(length))
+        data_start = _data_start(length)
+        self.capacity = self.header['capacity']
+        self.sections = {
+            key: np.memmap(path, dtype=np.dtype(section['dtype']), mode='r', offset=data_start + section['offset'], shape=tuple(section['shape']))
+            if np.prod(section['shape']) > 0 else np.zeros(section['shape'], dtype=np.dtype(section['dtype']))
+            for key, section in self.header['sections'].items()
+        }
+        self.names = [name.decode() for name in self.sections['names']]
+        self.index = {name: k for k, name in enumerate(self.names)}
+
+
+    def __len__(self):
+        return self.header['molecules']
+
+
+    def _range(self, key: str, k: int) -> tuple[int, int]:
+        offsets = self.sections[key]
+        return int(offsets[k]), int(offsets[k + 1])
+
+
+    def labels(self, k: int) -> list[str]:
+        start, end = self._range('node_offsets', k)
+        return [label.decode() for label in self.sections['labels'][start:end]]
+
+
+    def network(self, k: int) -> FlowNetwork:
+        """
+        Returns molecule k as flow network without building a NetworkX graph.
+        """
+        node_start, node_end = self._range('node_offsets', k)
+        edge_start, edge_end = self._range('edge_offsets', k)
+        arc_start, arc_end = self._range('arc_offsets', k)
+        sections = self.sections
+
+        return FlowNetwork(
+            self.labels(k),
+            _to_array('l', sections['csr_offsets'][node_start + k:node_end + k + 1]),
+            _to_array('l', sections['heads'][arc_start:arc_end]),
+            _to_array('l', sections['reverse'][arc_start:arc_end]),
+            _to_array('d', sections['capacity'][arc_start:arc_end]),
+            edge_end - edge_start,
+        )
+
+
+    def _attributes(self, prefix: str, start: int, end: int) -> list[dict]:
+        attributes = [{} for _ in range(end - start)]
+        for key, column in self.sections.items():
+            if not key.startswith(prefix + ':'):
+                continue
+            name = key[len(prefix) + 1:]
+            present = self.sections.get(f'{prefix}_present:{name}')
+            for i, value in enumerate(column[start:end]):
+                if present is None or present[start + i]:
+                    attributes[i][name] = value.decode() if isinstance(value, bytes) else value.item()
+
+        return attributes
+
+
+    def graph(self, k: int) -> nx.Graph | nx.DiGraph:
+        """
+        Returns molecule k as NetworkX graph with the same attributes as nx.read_graphml of the packed file.
+        """
+        node_start, node_end = self._range('node_offsets', k)
+        edge_start, edge_end = self._range('edge_offsets', k)
+        labels = self.labels(k)
+
+        G = nx.DiGraph() if self.sections['directed'][k] else nx.Graph()
+        G.add_nodes_from(zip(labels, self._attributes('node', node_start, node_end)))
+        edges = self.sections['edges'][edge_start:edge_end].tolist()
+        G.add_edges_from((labels[u], labels[v], data) for (u, v), data in zip(edges, self._attributes('edge', edge_start, edge_end)))
+
+        return G
+
+
+    def __getitem__(self, k: int | str) -> nx.Graph | nx.DiGraph:
+        return self.graph(self.index[k] if isinstance(k, str) else k)
+
+
+def is_corpus(path: str) -> bool:
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+_open_corpora: dict[str, Corpus] = {}
+
+def open_corpus(path: str) -> Corpus:
+    """
+    Returns the corpus at path, opened once per process.
+    """
+    if path not in _open_corpora:
+        _open_corpora[path] = Corpus(path)
+
+    return _open_corpora[path]
+
+
+def unpack_corpus(path: str, output_dir: str) -> int:
+    """
+    Writes every molecule of a corpus back to a GraphML file. Returns the number of written molecules.
+    """
+    corpus = Corpus(path)
+    os.makedirs(output_dir, exist_ok=True)
+    for k, name in enumerate(corpus.names):
+        nx.write_graphml(corpus.graph(k), os.path.join(output_dir, name))
+
+    return len(corpus)
+
+
+def main(argv: list[str] | None = None):
+    import batch
+
+    parser = argparse.ArgumentParser(description='Pack GraphML molecules into a binary corpus file or unpack it again.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack = commands.add_parser('pack', help='pack GraphML files, directories or glob patterns')
+    pack.add_argument('sources', nargs='+')
+    pack.add_argument('output')
+    pack.add_argument('-c', '--capacity', default='order', help='edge attribute used as capacity')
+    pack.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='number of worker processes for parsing')
+    unpack = commands.add_parser('unpack', help='write the molecules of a corpus file back to GraphML')
+    unpack.add_argument('corpus')
+    unpack.add_argument('output_dir')
+    args = parser.parse_args(argv)
+
+    if args.command == 'pack':
+        print(f'Packed {pack_corpus(batch.find_molecules(args.sources), args.output, args.capacity, args.workers)} molecules into {args.output}')
+    else:
+        print(f'Unpacked {unpack_corpus(args.corpus, args.output_dir)} molecules into {args.output_dir}')
+
+
+if __name__ == '__main__':
+    main()
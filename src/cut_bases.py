@@ -1,8 +1,82 @@
 import networkx as nx
+import numpy as np
 import fast_gauss as fg
+from stats import Stats, phase
 import varizani_yannakakis as vy
 
 
+class CutSpace:
+    """
+    Edge index of a graph for computing the edge vectors of cuts with big-int bit operations.
+
+    Bit j of an edge mask stands for the j-th edge of G.edges() and bit i of a node mask for the i-th node of G.nodes
+    (the node order of varizani_yannakakis vectors). An edge is cut if exactly one of its endpoints is on one side, so
+    the edge mask of a cut is the XOR of the incidence masks of the nodes on either side.
+    """
+    def __init__(self, G: nx.Graph | nx.DiGraph):
+        self.nodes = list(G.nodes)
+        self.edges = list(G.edges())
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.incidence = [0] * len(self.nodes)
+        for j, (u, v) in enumerate(self.edges):
+            self.incidence[self.index[u]] ^= 1 << j
+            self.incidence[self.index[v]] ^= 1 << j
+        # 0/1 incidence matrix for edge_vectors, built on first use
+        self._incidence_bits = None
+
+    def edge_mask(self, node_mask: int) -> int:
+        """
+        Returns the edge mask of the cut that separates the nodes in node_mask from all other nodes.
+        """
+        edge_mask = 0
+        while node_mask:
+            lowest = node_mask & -node_mask
+            edge_mask ^= self.incidence[lowest.bit_length() - 1]
+            node_mask ^= lowest
+
+        return edge_mask
+
+    def partition_mask(self, cut_partition: vy.ST_partition) -> int:
+        """
+        Returns the edge mask of a cut given as ST-partition.
+        """
+        edge_mask = 0
+        for node in cut_partition[0]:
+            edge_mask ^= self.incidence[self.index[node]]
+
+        return edge_mask
+
+    def edge_partition(self, edge_mask: int) -> set:
+        return {edge for j, edge in enumerate(self.edges) if edge_mask >> j & 1}
+
+    def to_vector(self, edge_mask: int) -> str:
+        """
+        Returns the edge mask as '0'/'1' string in the format of edge_partition_to_vector.
+        """
+        return vy.mask_to_vector(edge_mask, len(self.edges))
+
+    def incidence_matrix(self) -> np.ndarray:
+        """
+        Returns the node-edge incidence matrix over GF(2) as boolean array of shape (nodes, edges).
+        """
+        matrix = np.zeros((len(self.nodes), len(self.edges)), dtype=bool)
+        for j, (u, v) in enumerate(self.edges):
+            matrix[self.index[u], j] ^= True
+            matrix[self.index[v], j] ^= True
+
+        return matrix
+
+    def edge_vectors(self, node_masks: list[int]) -> np.ndarray:
+        """
+        Returns the edge vectors of a batch of cuts given as node masks as boolean array of shape (cuts, edges).
+        """
+        if self._incidence_bits is None:
+            self._incidence_bits = self.incidence_matrix().astype(np.uint8)
+        nodes = np.array([[mask >> i & 1 for i in range(len(self.nodes))] for mask in node_masks], dtype=np.uint8).reshape(len(node_masks), len(self.nodes))
+
+        return (nodes @ self._incidence_bits & 1).astype(bool)
+
+
 def cut_partition_to_edge_partition(G: nx.DiGraph, cut_partition: vy.ST_partition) -> set:
     edge_partition = set()
     for edge in G.edges():
@@ -34,15 +108,24 @@ def edge_vectors_to_matrix(edge_vectors: list[str]) -> list[list[int]]:
     return matrix
 
 
-def canonical_greedy_cut_basis(G: nx.Graph) -> list[list[int]]:
-    cuts = [cut.st_partition for cut in vy.varizani_yannakakis(G)]
+def canonical_greedy_cut_basis(G: nx.Graph, stats: Stats | None = None) -> list[list[int]]:
+    space = CutSpace(G)
     edge_vectors = []
-    for cut in cuts:
-        edge_partition = cut_partition_to_edge_partition(G, cut)
-        edge_vectors += [edge_partition_to_vector(G, edge_partition)]
-        matrix = edge_vectors_to_matrix(edge_vectors)
-        if fg.has_dependent_rows(matrix):
-            edge_vectors.pop()
+    basis = fg.GF2Basis()
+    # The cut space has dimension n - c for c (weakly) connected components, the enumeration stops once it is spanned
+    rank = G.number_of_nodes() - (nx.number_weakly_connected_components(G) if G.is_directed() else nx.number_connected_components(G))
+    for cut in vy.iter_cuts(G, stats=stats) if rank > 0 else ():
+        with phase(stats, 'dependency_check'):
+            edge_mask = space.edge_mask(cut.partition[0])
+            independent = basis.insert(edge_mask)
+        if stats is not None:
+            stats.add('dependency_checks')
+        if independent:
+            edge_vectors.append(space.to_vector(edge_mask))
+            if len(edge_vectors) == rank:
+                break
+    if stats is not None:
+        stats.emit()
 
     return edge_vectors
 
@@ -42,4 +42,43 @@ def has_dependent_rows(original_mat):
         if (pivot[i] == False):
             return True
         
-    return False
\ No newline at end of file
+    return False
+
+
+class GF2Basis:
+    """
+    Incrementally built basis of a GF(2) row space. Rows are Python ints (bit j is column j) and are stored reduced
+    by their highest set bit, so testing or inserting a row is a single reduction pass against the existing pivots.
+    """
+    def __init__(self):
+        self.pivots = {}
+
+    def __len__(self):
+        return len(self.pivots)
+
+    def reduce(self, row: int) -> int:
+        """
+        Returns the row reduced by the basis, which is 0 if and only if the row is in the span of the basis.
+        """
+        pivots = self.pivots
+        while row:
+            pivot = pivots.get(row.bit_length() - 1)
+            if pivot is None:
+                return row
+            row ^= pivot
+
+        return row
+
+    def is_independent(self, row: int) -> bool:
+        return self.reduce(row) != 0
+
+    def insert(self, row: int) -> bool:
+        """
+        Adds the row to the basis if it is independent of it. Returns whether the row was added.
+        """
+        row = self.reduce(row)
+        if not row:
+            return False
+        self.pivots[row.bit_length() - 1] = row
+
+        return True
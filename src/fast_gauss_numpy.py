@@ -0,0 +1,154 @@
+"""
+This file contains a vectorized GF(2) elimination on rows packed into uint64 words, for rank and independence queries on
+many matrices at once.
+"""
+import numpy as np
+
+
+def pack_rows(mat) -> np.ndarray:
+    """
+    Packs a 0/1 matrix (nested lists, '0'/'1' strings or a 2D array) into an array of shape (rows, words) of uint64,
+    where column j is bit j % 64 of word j // 64.
+    """
+    if len(mat) and isinstance(mat[0], str):
+        mat = [[bit == '1' for bit in row] for row in mat]
+    bits = np.asarray(mat, dtype=np.uint8).reshape(len(mat), -1)
+    words = max(1, -(-bits.shape[1] // 64))
+    padded = np.zeros((bits.shape[0], 64 * words), dtype=np.uint8)
+    padded[:, :bits.shape[1]] = bits
+
+    return np.packbits(padded, axis=1, bitorder='little').view('<u8').astype(np.uint64)
+
+
+def pack_batch(mats) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Packs a sequence of 0/1 matrices into one zero padded array of shape (batch, rows, words) of uint64.
+    Returns the array together with the number of rows of every matrix.
+    """
+    packed = [pack_rows(mat) for mat in mats]
+    rows = np.array([p.shape[0] for p in packed], dtype=np.int64)
+    batch = np.zeros((len(packed), max(rows, default=0), max((p.shape[1] for p in packed), default=1)), dtype=np.uint64)
+    for b, p in enumerate(packed):
+        batch[b, :p.shape[0], :p.shape[1]] = p
+
+    return batch, rows
+
+
+def _get_bits(words: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """
+    Returns bit columns[..., k] of the packed rows words[..., :] as an array of shape columns.shape (0 for columns < 0).
+    """
+    safe = np.maximum(columns, 0)
+    if words.ndim == columns.ndim:
+        word = np.take_along_axis(words, safe >> 6, axis=-1)
+    else:
+        word = np.take_along_axis(words, (safe >> 6)[..., None], axis=-1)[..., 0]
+    bits = (word >> (safe & 63).astype(np.uint64)) & np.uint64(1)
+
+    return np.where(columns >= 0, bits, 0).astype(np.uint64)
+
+
+def eliminate(batch: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Row-by-row Gauss-Jordan elimination over GF(2) on all matrices of a packed batch (batch, rows, words) at once.
+
+    Row i of every matrix is reduced against the reduced row echelon form of rows 0..i-1, which is a single masked XOR
+    reduction because every pivot column is set in exactly one pivot row. Returns a boolean array (batch, rows) marking
+    the rows that are independent of all rows before them, and for every row the packed combination (batch, rows,
+    row words) of original rows that XORs to its reduced form, which is the dependency witness of a dependent row.
+    """
+    B, R, W = batch.shape
+    R_words = max(1, -(-R // 64))
+    pivot_rows = np.zeros((B, R, W), dtype=np.uint64)
+    pivot_combinations = np.zeros((B, R, R_words), dtype=np.uint64)
+    pivot_columns = np.full((B, R), -1, dtype=np.int64)
+    independent = np.zeros((B, R), dtype=bool)
+    combinations = np.zeros((B, R, R_words), dtype=np.uint64)
+
+    for i in range(R):
+        row = batch[:, i, :]
+        combination = np.zeros((B, R_words), dtype=np.uint64)
+        combination[:, i >> 6] = np.uint64(1) << np.uint64(i & 63)
+
+        # Reduce by every pivot row whose pivot column is set in the row
+        coefficients = _get_bits(row, pivot_columns)
+        reduced = row ^ np.bitwise_xor.reduce(pivot_rows * coefficients[:, :, None], axis=1)
+        combination ^= np.bitwise_xor.reduce(pivot_combinations * coefficients[:, :, None], axis=1)
+        combinations[:, i, :] = combination
+
+        is_new = reduced.any(axis=1)
+        independent[:, i] = is_new
+        if not is_new.any():
+            continue
+
+        # The lowest set bit of a new row becomes its pivot column and is cleared from all other pivot rows
+        first_word = np.argmax(reduced != 0, axis=1)
+        word = reduced[np.arange(B), first_word]
+        lowest = np.where(is_new, word & (~word + np.uint64(1)), np.uint64(1))
+        column = np.where(is_new, 64 * first_word + np.log2(lowest.astype(np.float64)).astype(np.int64), -1)
+
+        has_column = _get_bits(pivot_rows, np.repeat(column[:, None], R, axis=1))
+        pivot_rows ^= has_column[:, :, None] * reduced[:, None, :]
+        pivot_combinations ^= has_column[:, :, None] * combination[:, None, :]
+        pivot_rows[:, i, :] = np.where(is_new[:, None], reduced, 0)
+        pivot_combinations[:, i, :] = np.where(is_new[:, None], combination, 0)
+        pivot_columns[:, i] = column
+
+    return independent, combinations
+
+
+def rank_batch(mats) -> np.ndarray:
+    """
+    Returns the GF(2) rank of every matrix.
+    """
+    batch, _ = pack_batch(mats)
+    independent, _ = eliminate(batch)
+
+    return independent.sum(axis=1)
+
+
+def independent_rows_batch(mats) -> list[list[int]]:
+    """
+    Returns for every matrix the indices of the rows that are independent of all rows before them,
+    i.e. the rows kept by the greedy algorithm when the rows are sorted by weight.
+    """
+    batch, rows = pack_batch(mats)
+    independent, _ = eliminate(batch)
+
+    return [np.flatnonzero(independent[b, :rows[b]]).tolist() for b in range(len(rows))]
+
+
+def dependency_witness_batch(mats) -> list[list[int] | None]:
+    """
+    Returns for every matrix the indices of a set of rows that XOR to zero (ending with the first dependent row),
+    or None if the rows are linearly independent.
+    """
+    batch, rows = pack_batch(mats)
+    independent, combinations = eliminate(batch)
+
+    witnesses = []
+    for b in range(len(rows)):
+        dependent = np.flatnonzero(~independent[b, :rows[b]])
+        if len(dependent) == 0:
+            witnesses.append(None)
+            continue
+        bits = np.unpackbits(combinations[b, dependent[0]].view(np.uint8), bitorder='little')
+        witnesses.append(np.flatnonzero(bits).tolist())
+
+    return witnesses
+
+
+def rank(mat) -> int:
+    return int(rank_batch([mat])[0])
+
+
+def independent_rows(mat) -> list[int]:
+    return independent_rows_batch([mat])[0]
+
+
+def dependency_witness(mat) -> list[int] | None:
+    return dependency_witness_batch([mat])[0]
+
+
+def has_dependent_rows(mat) -> bool:
+    return dependency_witness(mat) is not None
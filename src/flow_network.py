@@ -0,0 +1,313 @@
+"""
+This file contains a compact, array-backed flow network for the push-relabel and Hao-Orlin engines.
+"""
+import networkx as nx
+import hashlib
+import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class FlowNetwork:
+    """
+    Flow network with integer node ids and CSR adjacency.
+
+    Every arc is stored together with a paired reverse arc, so an undirected edge (or two opposite directed edges) becomes
+    one pair of arcs whose residual capacities are updated through flat arrays instead of NetworkX attribute dictionaries.
+
+    The topology and capacities are only read by the engines, which work on their own arrays from new_state(), so
+    concurrent runs on the same network (e.g. from threads) do not interfere. Flows are passed around as arrays of one
+    value per arc, e.g. to compute residual cuts from them.
+
+    edge_count is the number of edges of the graph the network was built from, counting parallel edges and both
+    directions of a directed pair like G.number_of_edges(); it defaults to the number of arc pairs.
+    """
+    def __init__(self, labels: list, offsets: array, heads: array, reverse: array, capacity: array, edge_count: int | None = None):
+        self.labels = labels
+        self.index = {label: i for i, label in enumerate(labels)}
+        self.n = len(labels)
+        self.m = len(heads)
+        self.edge_count = self.m // 2 if edge_count is None else edge_count
+        self.offsets = offsets
+        self.heads = heads
+        self.reverse = reverse
+        self.capacity = capacity
+
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph | nx.DiGraph, capacity: str = 'capacity') -> 'FlowNetwork':
+        """
+        Converts a NetworkX graph into a flow network. Missing capacities are treated as infinite (like networkx.minimum_cut),
+        undirected edges get the same capacity in both directions and self-loops are ignored.
+        """
+        labels = list(G.nodes)
+        index = {label: i for i, label in enumerate(labels)}
+        edges = ((index[u], index[v], c) for u, v, c in G.edges(data=capacity, default=math.inf))
+
+        return cls.from_edges(labels, edges, G.is_directed())
+
+
+    @classmethod
+    def prepare(cls, G: 'nx.Graph | nx.DiGraph | FlowNetwork', capacity: str = 'capacity') -> 'FlowNetwork':
+        """
+        Returns G converted once into a flow network (or G itself if it already is one), for answering many max_flow,
+        min_cut and min_cuts queries on the same graph. Every query only resets the flow arrays.
+        """
+        return G if not isinstance(G, nx.Graph) else cls.from_networkx(G, capacity)
+
+
+    @classmethod
+    def from_edges(cls, labels: list, edges, directed: bool, edge_count: int | None = None) -> 'FlowNetwork':
+        """
+        Builds a flow network from (i, j, capacity) edges over the node ids 0..len(labels)-1. Undirected edges get the same
+        capacity in both directions and self-loops are ignored. The edge count is the number of given edges by default.
+        """
+        # Merge both directions of a node pair into one arc pair: (i, j) with i < j -> [capacity i->j, capacity j->i]
+        pairs = {}
+        count = 0
+        for i, j, c in edges:
+            count += 1
+            if i == j:
+                continue
+            key = (i, j) if i < j else (j, i)
+            caps = pairs.setdefault(key, [0, 0])
+            if not directed:
+                caps[0] += c
+                caps[1] += c
+            elif i < j:
+                caps[0] += c
+            else:
+                caps[1] += c
+
+        return cls.from_arc_pairs(labels, ((i, j, caps[0], caps[1]) for (i, j), caps in pairs.items()), count if edge_count is None else edge_count)
+
+
+    @classmethod
+    def from_arc_pairs(cls, labels: list, arc_pairs, edge_count: int | None = None) -> 'FlowNetwork':
+        """
+        Builds the CSR arrays from (i, j, capacity i->j, capacity j->i) tuples over the node ids 0..len(labels)-1.
+        """
+        arc_pairs = list(arc_pairs)
+        n = len(labels)
+
+        degree = [0] * (n + 1)
+        for i, j, _, _ in arc_pairs:
+            degree[i + 1] += 1
+            degree[j + 1] += 1
+        for i in range(n):
+            degree[i + 1] += degree[i]
+
+        m = degree[n]
+        offsets = array('l', degree)
+        position = degree[:n]
+        heads = array('l', bytes(array('l').itemsize * m))
+        reverse = array('l', bytes(array('l').itemsize * m))
+        capacity = array('d', bytes(8 * m))
+        for i, j, c_ij, c_ji in arc_pairs:
+            a, b = position[i], position[j]
+            position[i] += 1
+            position[j] += 1
+            heads[a], heads[b] = j, i
+            reverse[a], reverse[b] = b, a
+            capacity[a], capacity[b] = c_ij, c_ji
+
+        return cls(labels, offsets, heads, reverse, capacity, edge_count)
+
+
+    def contract(self, node_map: list[int], labels: list) -> 'FlowNetwork':
+        """
+        Returns the flow network in which every node i is merged into node node_map[i] of a network with the given labels.
+        Arcs inside a merged node are dropped and parallel arcs are summed, all in a single pass over the arcs.
+        """
+        offsets, heads, capacity = self.offsets, self.heads, self.capacity
+
+        # Visit every arc pair once from its lower endpoint: (i, j) with i < j -> [capacity i->j, capacity j->i]
+        pairs = {}
+        for u in range(self.n):
+            i = node_map[u]
+            for a in range(offsets[u], offsets[u + 1]):
+                v = heads[a]
+                if v < u or i == node_map[v]:
+                    continue
+                j = node_map[v]
+                if i < j:
+                    caps = pairs.setdefault((i, j), [0, 0])
+                    caps[0] += capacity[a]
+                    caps[1] += capacity[self.reverse[a]]
+                else:
+                    caps = pairs.setdefault((j, i), [0, 0])
+                    caps[0] += capacity[self.reverse[a]]
+                    caps[1] += capacity[a]
+
+        return FlowNetwork.from_arc_pairs(labels, ((i, j, caps[0], caps[1]) for (i, j), caps in pairs.items()))
+
+
+    @property
+    def nodes(self) -> list:
+        """
+        Node labels in id order, so that a flow network can stand in for a NetworkX graph where only the nodes are needed.
+        """
+        return self.labels
+
+
+    def number_of_nodes(self) -> int:
+        return self.n
+
+
+    def number_of_edges(self) -> int:
+        return self.edge_count
+
+
+    def is_directed(self) -> bool:
+        return True
+
+
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of the node labels, the arcs and the capacities, which identifies the network across processes.
+        """
+        digest = hashlib.sha256(repr(self.labels).encode())
+        for values in (self.offsets, self.heads, self.capacity):
+            digest.update(values.tobytes())
+
+        return digest.hexdigest()
+
+
+    def new_state(self) -> tuple[array, array, array]:
+        """
+        Returns zeroed flow, excess and height arrays for one run of an engine.
+        """
+        return array('d', bytes(8 * self.m)), array('d', bytes(8 * self.n)), array('l', bytes(array('l').itemsize * self.n))
+
+
+    def reversed(self) -> 'FlowNetwork':
+        """
+        Returns a new flow network with every arc reversed (arc capacities are swapped with their paired reverse arcs).
+        """
+        capacity = array('d', (self.capacity[self.reverse[a]] for a in range(self.m)))
+        return FlowNetwork(self.labels, self.offsets, self.heads, self.reverse, capacity, self.edge_count)
+
+
+    def bounded(self) -> tuple['FlowNetwork', float | None]:
+        """
+        Returns the network with every infinite capacity replaced by the sum of the finite capacities plus one, which
+        exceeds the value of every cut without an infinite arc, together with that bound. Engines that subtract
+        capacities run on it, so that no inf - inf occurs; cut values of at least the bound stand for infinite cuts.
+        Without infinite capacities the network itself and None are returned.
+        """
+        if math.inf not in self.capacity:
+            return self, None
+        bound = sum(c for c in self.capacity if c != math.inf) + 1
+        capacity = array('d', (bound if c == math.inf else c for c in self.capacity))
+
+        return FlowNetwork(self.labels, self.offsets, self.heads, self.reverse, capacity, self.edge_count), bound
+
+
+    def source_side(self, s: int, flow: array) -> bytearray:
+        """
+        Returns a mask of all nodes reachable from node id s over arcs with positive residual capacity under flow.
+        """
+        offsets, heads, capacity = self.offsets, self.heads, self.capacity
+        reached = bytearray(self.n)
+        reached[s] = 1
+        stack = [s]
+        while stack:
+            u = stack.pop()
+            for a in range(offsets[u], offsets[u + 1]):
+                v = heads[a]
+                if not reached[v] and capacity[a] - flow[a] > 0:
+                    reached[v] = 1
+                    stack.append(v)
+
+        return reached
+
+
+    def sink_side(self, t: int, flow: array) -> bytearray:
+        """
+        Returns a mask of all nodes that cannot reach node id t over arcs with positive residual capacity under flow, i.e.
+        the source side of the minimum cut with the smallest possible sink side.
+        """
+        offsets, heads, reverse, capacity = self.offsets, self.heads, self.reverse, self.capacity
+        reaching = bytearray(self.n)
+        reaching[t] = 1
+        stack = [t]
+        while stack:
+            u = stack.pop()
+            for a in range(offsets[u], offsets[u + 1]):
+                v = heads[a]
+                if not reaching[v] and capacity[reverse[a]] - flow[reverse[a]] > 0:
+                    reaching[v] = 1
+                    stack.append(v)
+
+        return bytearray(1 - inside for inside in reaching)
+
+
+    def max_flow(self, s, t) -> float:
+        """
+        Returns the value of a maximum flow from the node labeled s to the node labeled t.
+        """
+        return self.min_cut(s, t)[0]
+
+
+    def min_cut(self, s, t, sink_side=False) -> tuple[float, tuple[set, set]]:
+        """
+        Returns the value and S-T partition of a minimum cut between the nodes labeled s and t, computed by push-relabel.
+        The partition is the one with the smallest source side, or the smallest sink side if sink_side is set.
+        """
+        import push_relabel as pr
+
+        return pr.push_relabel_network(self, s, t, sink_side=sink_side)
+
+
+    def min_cuts(self, pairs, sink_side=False, workers: int | None = None, pool: str = 'process') -> list[tuple[float, tuple[set, set]]]:
+        """
+        Returns min_cut(s, t) for every (s, t) in pairs, in order. With workers > 1 the pairs are solved in parallel: with
+        pool='process' in a process pool to which the network is sent once per worker, with pool='thread' in a thread pool
+        that shares the network without pickling it (which only runs in parallel on free-threaded Python builds).
+        """
+        pairs = list(pairs)
+        if workers is None or workers <= 1 or len(pairs) <= 1:
+            return [self.min_cut(s, t, sink_side) for s, t in pairs]
+
+        if pool == 'thread':
+            with ThreadPoolExecutor(workers) as executor:
+                return list(executor.map(self.min_cut, [s for s, _ in pairs], [t for _, t in pairs], [sink_side] * len(pairs)))
+        with ProcessPoolExecutor(workers, initializer=_init_min_cut_worker, initargs=(self,)) as executor:
+            return list(executor.map(_min_cut_in_worker, pairs, [sink_side] * len(pairs), chunksize=max(1, len(pairs) // (4 * workers))))
+
+
+    def cut_value(self, source_mask) -> float:
+        """
+        Returns the summed capacity of all arcs leaving the nodes marked in source_mask.
+        """
+        offsets, heads, capacity = self.offsets, self.heads, self.capacity
+        value = 0
+        for u in range(self.n):
+            if source_mask[u]:
+                for a in range(offsets[u], offsets[u + 1]):
+                    if not source_mask[heads[a]]:
+                        value += capacity[a]
+
+        return value
+
+
+    def to_partition(self, source_mask) -> tuple[set, set]:
+        """
+        Translates a mask over node ids back into an S-T partition of the original node labels.
+        """
+        S = {label for label, inside in zip(self.labels, source_mask) if inside}
+        T = {label for label, inside in zip(self.labels, source_mask) if not inside}
+
+        return (S, T)
+
+
+# Network of a min_cuts worker process, sent once when the worker starts
+_worker_network = []
+
+
+def _init_min_cut_worker(N: FlowNetwork):
+    _worker_network[:] = [N]
+
+
+def _min_cut_in_worker(pair: tuple, sink_side: bool) -> tuple[float, tuple[set, set]]:
+    return _worker_network[0].min_cut(*pair, sink_side)
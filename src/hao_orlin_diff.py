@@ -3,6 +3,8 @@ import math
 
 
 def hao_orlin_directed(G, s):
+    # The solver state is kept in dictionaries instead of node and edge attributes, so G is never modified
+    excess, height, preflow = {}, {}, {}
 
 
     def initialize():
@@ -10,14 +12,14 @@ def hao_orlin_directed(G, s):
         Initializes the graph for the push-relabel algorithm.
         """
         for v in G.nodes:
-            G.nodes[v]['excess'] = 0
-            G.nodes[v]['height'] = 0
-        G.nodes[s]['excess'] = math.inf
-        G.nodes[s]['height'] = len(G.nodes)
+            excess[v] = 0
+            height[v] = 0
+        excess[s] = math.inf
+        height[s] = len(G.nodes)
         
         for u, v in G.edges:
-            G.edges[u, v]['preflow'] = 0
-            G.edges[v, u]['preflow'] = 0
+            preflow[u, v] = 0
+            preflow[v, u] = 0
 
         for v in G.neighbors(s):
             push(s, v)
@@ -28,18 +30,18 @@ def hao_orlin_directed(G, s):
         Pushes flow from u to v.
         """
         if u in X:
-            send = G.edges[u, v]['capacity'] - G.edges[u, v]['preflow']
+            send = G.edges[u, v]['capacity'] - preflow[u, v]
         else:
-            send = min(G.nodes[u]['excess'], G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'])
-        G.nodes[u]['excess'] -= send
-        G.nodes[v]['excess'] += send
-        G.edges[u, v]['preflow'] += send
-        G.edges[v, u]['preflow'] -= send
+            send = min(excess[u], G.edges[u, v]['capacity'] - preflow[u, v])
+        excess[u] -= send
+        excess[v] += send
+        preflow[u, v] += send
+        preflow[v, u] -= send
 
         print(f'Pushing {u} -> {v} with {send}')
-        print(G.nodes[v]['excess'])
-        print(G.nodes[v]['height'])
-        if v != s and v != t and G.nodes[v]['height'] < k and v not in ACTIVE_NODES: # and v!= t_prime
+        print(excess[v])
+        print(height[v])
+        if v != s and v != t and height[v] < k and v not in ACTIVE_NODES: # and v!= t_prime
             ACTIVE_NODES.append(v)
 
 
@@ -51,30 +53,30 @@ def hao_orlin_directed(G, s):
         nonlocal ACTIVE_NODES
         heights = []
         sorted_height_dict = get_sorted_node_heights()
-        if(list(sorted_height_dict.values()).count(G.nodes[u]['height']) == 1):
-            print(f'Node {u} has unique height {G.nodes[u]["height"]}')
+        if(list(sorted_height_dict.values()).count(height[u]) == 1):
+            print(f'Node {u} has unique height {height[u]}')
 
-            k = G.nodes[u]['height']
+            k = height[u]
             print(k)
             if ACTIVE_NODES is not None:
                 return
             for v in ACTIVE_NODES:
-                if G.nodes[v]['height'] >= k:
+                if height[v] >= k:
                     ACTIVE_NODES.remove(v)
             return
         
         for v in G.neighbors(u):
-            if G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'] > 0:
-                heights.append(G.nodes[v]['height'])
+            if G.edges[u, v]['capacity'] - preflow[u, v] > 0:
+                heights.append(height[v])
                 min_height = min(heights)
         print(f'Relabeling {u} to {min_height + 1}')
 
-        G.nodes[u]['height'] = min_height + 1
+        height[u] = min_height + 1
 
-        if G.nodes[u]['height'] >= k:
+        if height[u] >= k:
             print('Reseting k')
             k = n - 1
-            ACTIVE_NODES = [v for v in (V-{t}-{s}-{u}) if G.nodes[v]['excess'] > 0 and G.nodes[v]['height'] < k]
+            ACTIVE_NODES = [v for v in (V-{t}-{s}-{u}) if excess[v] > 0 and height[v] < k]
            
 
 
@@ -83,7 +85,7 @@ def hao_orlin_directed(G, s):
         Discharges the excess flow from node u.
         """
         for v in G.neighbors(u):
-            if G.nodes[u]['height'] == G.nodes[v]['height'] + 1 and G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'] > 0 and v not in X and G.nodes[u]['excess'] > 0:
+            if height[u] == height[v] + 1 and G.edges[u, v]['capacity'] - preflow[u, v] > 0 and v not in X and excess[u] > 0:
                 push(u, v)
                 return  
 
@@ -91,7 +93,7 @@ def hao_orlin_directed(G, s):
 
 
     def get_sorted_node_heights():
-        height_dict = {node: G.nodes[node]['height'] for node in G.nodes}
+        height_dict = {node: height[node] for node in G.nodes}
         sorted_height_dict = dict(sorted(height_dict.items(), key=lambda item: item[1]))
 
         return sorted_height_dict
@@ -101,19 +103,19 @@ def hao_orlin_directed(G, s):
         """
         Returns cut level of graph.
         """
-        height_dict = {node: G.nodes[node]['height'] for node in G.nodes}  
+        height_dict = {node: height[node] for node in G.nodes}  
         sorted_height_dict = dict(sorted(height_dict.items(), key=lambda item: item[1]))
 
         print(sorted_height_dict)
 
-        for node, height in sorted_height_dict.items():
+        for node, level in sorted_height_dict.items():
             # Check if height only appears once
-            if list(sorted_height_dict.values()).count(height) == 1:
-                print(node, height)
-                valid_neighbors = [v for v in G.neighbors(node) if G.edges[node, v]['preflow'] < G.edges[node, v]['capacity'] and v not in X]
+            if list(sorted_height_dict.values()).count(level) == 1:
+                print(node, level)
+                valid_neighbors = [v for v in G.neighbors(node) if preflow[node, v] < G.edges[node, v]['capacity'] and v not in X]
                 print(valid_neighbors)
-                if all([height < G.nodes[v]['height'] for v in valid_neighbors]):
-                    return height
+                if all([level < height[v] for v in valid_neighbors]):
+                    return level
                 
         return n - 1
     
@@ -128,7 +130,7 @@ def hao_orlin_directed(G, s):
         """
         Returns the edges with saturated flow.
         """
-        return [(u, v) for u, v in G.edges if G.edges[u, v]['preflow'] == G.edges[u, v]['capacity']]
+        return [(u, v) for u, v in G.edges if preflow[u, v] == G.edges[u, v]['capacity']]
 
     ACTIVE_NODES = [] # nodes with v positive excess and height(v) < k
     V = set(G.nodes)
@@ -147,8 +149,8 @@ def hao_orlin_directed(G, s):
         print(t)
 
         print(k)
-        print([G.nodes[v]['excess'] for v in V])
-        print([G.nodes[v]['height'] for v in V])
+        print([excess[v] for v in V])
+        print([height[v] for v in V])
         while ACTIVE_NODES: # TODO: ACTIVE NODES may be empty at some point
             print(ACTIVE_NODES)
             u = ACTIVE_NODES.pop()
@@ -158,39 +160,39 @@ def hao_orlin_directed(G, s):
             # for u in G.nodes:
             #     if u in ACTIVE_NODES:
             #         ACTIVE_NODES.remove(u)
-            #     if G.nodes[u]['excess'] > 0 and G.nodes[u]['height'] < k and u != t and u not in X:
+            #     if excess[u] > 0 and height[u] < k and u != t and u not in X:
             #         ACTIVE_NODES.append(u)
-            # print(G.nodes[u]['excess'])
-            if G.nodes[u]['excess'] > 0 and G.nodes[u]['height'] < k and u not in ACTIVE_NODES:
+            # print(excess[u])
+            if excess[u] > 0 and height[u] < k and u not in ACTIVE_NODES:
                 ACTIVE_NODES.append(u)
             print(ACTIVE_NODES)
 
         print(k)
         print(k)
         print(get_saturated_edges())
-        S = set([i for i in V if G.nodes[i]['height'] >= k and i != t])
+        S = set([i for i in V if height[i] >= k and i != t])
         # k = get_cut_level()
 
 
-        current_cut_value = G.nodes[t]['excess'] # aber der cut ist dann falsch???
+        current_cut_value = excess[t] # aber der cut ist dann falsch???
         current_cut_value = get_cut_value(S)
         if current_cut_value < min_cut_value:
             min_cut_value = current_cut_value
             cut = S
 
-        print([G.nodes[v]['excess'] for v in V])   
-        print([G.nodes[v]['height'] for v in V])   
+        print([excess[v] for v in V])   
+        print([height[v] for v in V])   
         print(S)
         print(current_cut_value)
 
         X.add(t)
-        G.nodes[t]['height'] = n
-        print([G.nodes[v]['height'] for v in (V - X)])
+        height[t] = n
+        print([height[v] for v in (V - X)])
         print(V)
         print(X)
-        t_prime = min((v for v in (V - X)), key=lambda v: G.nodes[v]['height']) if V != X else None
+        t_prime = min((v for v in (V - X)), key=lambda v: height[v]) if V != X else None
 
-        G.nodes[t]['excess'] = math.inf
+        excess[t] = math.inf
         for v in G.neighbors(t):
             push(t, v)
         
@@ -198,9 +200,9 @@ def hao_orlin_directed(G, s):
         if t in ACTIVE_NODES:
             ACTIVE_NODES.remove(t)
 
-        if t == None or G.nodes[t]['height'] >= k:
+        if t == None or height[t] >= k:
             k = n -1
-            ACTIVE_NODES = [v for v in (V-{t}-{s}) if G.nodes[v]['excess'] > 0 and G.nodes[v]['height'] < k]
+            ACTIVE_NODES = [v for v in (V-{t}-{s}) if excess[v] > 0 and height[v] < k]
         print()
 
     cut = (cut, V - cut)
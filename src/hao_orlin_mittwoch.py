@@ -3,6 +3,8 @@ import math
 
 
 def hao_orlin_directed(G, s):
+    # The solver state is kept in dictionaries instead of node and edge attributes, so G is never modified
+    excess, height, preflow = {}, {}, {}
 
 
     def initialize():
@@ -10,14 +12,14 @@ def hao_orlin_directed(G, s):
         Initializes the graph for the push-relabel algorithm.
         """
         for v in G.nodes:
-            G.nodes[v]['excess'] = 0
-            G.nodes[v]['height'] = 0
-        G.nodes[s]['excess'] = math.inf
-        G.nodes[s]['height'] = len(G.nodes)
+            excess[v] = 0
+            height[v] = 0
+        excess[s] = math.inf
+        height[s] = len(G.nodes)
         
         for u, v in G.edges:
-            G.edges[u, v]['preflow'] = 0
-            G.edges[v, u]['preflow'] = 0
+            preflow[u, v] = 0
+            preflow[v, u] = 0
 
         for v in G.neighbors(s):
             push(s, v)
@@ -27,13 +29,13 @@ def hao_orlin_directed(G, s):
         """
         Pushes flow from u to v.
         """
-        send = min(G.nodes[u]['excess'], G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'])
-        G.nodes[u]['excess'] -= send
-        G.nodes[v]['excess'] += send
-        G.edges[u, v]['preflow'] += send
-        G.edges[v, u]['preflow'] -= send
+        send = min(excess[u], G.edges[u, v]['capacity'] - preflow[u, v])
+        excess[u] -= send
+        excess[v] += send
+        preflow[u, v] += send
+        preflow[v, u] -= send
 
-        if v != s and v != t and v!= t_prime and G.nodes[v]['height'] < k:
+        if v != s and v != t and v!= t_prime and height[v] < k:
             ACTIVE_NODES.append(v)
 
 
@@ -43,24 +45,24 @@ def hao_orlin_directed(G, s):
         """
         heights = []
         for v in G.neighbors(u):
-            if G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'] > 0:
-                heights.append(G.nodes[v]['height'])
+            if G.edges[u, v]['capacity'] - preflow[u, v] > 0:
+                heights.append(height[v])
                 min_height = min(heights)
 
-        G.nodes[u]['height'] = min_height + 1
+        height[u] = min_height + 1
 
 
     def discharge(u):
         """
         Discharges the excess flow from node u.
         """
-        while G.nodes[u]['excess'] > 0:
-            if G.nodes[u]['height'] >= k:
+        while excess[u] > 0:
+            if height[u] >= k:
                 break
             for v in G.neighbors(u):
-                if G.nodes[u]['height'] == G.nodes[v]['height'] + 1 and G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'] > 0:
+                if height[u] == height[v] + 1 and G.edges[u, v]['capacity'] - preflow[u, v] > 0:
                     push(u, v)
-                    if G.nodes[u]['excess'] == 0:
+                    if excess[u] == 0:
                         break
                 else:
                     relabel(u)
@@ -70,14 +72,14 @@ def hao_orlin_directed(G, s):
         """
         Returns cut level of graph.
         """
-        height_dict = {node: G.nodes[node]['height'] for node in G.nodes if node != t}
+        height_dict = {node: height[node] for node in G.nodes if node != t}
         sorted_height_dict = dict(sorted(height_dict.items(), key=lambda item: item[1]))
 
-        for node, height in sorted_height_dict.items():
+        for node, level in sorted_height_dict.items():
             # Check if height only appears once
-            if list(sorted_height_dict.values()).count(height) == 1:
-                if all([height < G.nodes[v]['height'] for v in G.neighbors(node) if G.edges[node, v]['preflow'] < G.edges[node, v]['capacity']]):
-                    return height
+            if list(sorted_height_dict.values()).count(level) == 1:
+                if all([level < height[v] for v in G.neighbors(node) if preflow[node, v] < G.edges[node, v]['capacity']]):
+                    return level
                 
         return n - 1
     
@@ -106,14 +108,14 @@ def hao_orlin_directed(G, s):
 
     while X != V:
 
-        G.nodes[t]['height'] = 0
+        height[t] = 0
 
         while ACTIVE_NODES: # TODO: ACTIVE NODES may be empty at some point
             u = ACTIVE_NODES.pop()
             discharge(u)
 
         k = get_cut_level()
-        S = set([i for i in V if G.nodes[i]['height'] >= k])
+        S = set([i for i in V if height[i] >= k])
 
         current_cut_value = get_cut_value(S)
         if current_cut_value < min_cut_value:
@@ -121,10 +123,10 @@ def hao_orlin_directed(G, s):
             cut = S
 
         X.add(t)
-        t_prime = min((v for v in V if v not in X), key=lambda v: G.nodes[v]['height']) if V != X else None
+        t_prime = min((v for v in V if v not in X), key=lambda v: height[v]) if V != X else None
 
-        G.nodes[t]['height'] = n
-        G.nodes[t]['excess'] = math.inf
+        height[t] = n
+        excess[t] = math.inf
         for v in G.neighbors(t):
             push(t, v)
         
@@ -3,32 +3,38 @@ This file contains the implementation of the Hao-Orlin algorithm as described in
 """
 import networkx as nx
 import math
+from flow_network import FlowNetwork
+from budget import Budget
+from stats import Stats
 
 
 def hao_orlin_directed(G, s):
     """
     This function implements the Hao-Orlin algorithm for directed graphs.
     """
+    # The solver state is kept in dictionaries instead of node and edge attributes, so G is never modified
+    excess, height, flow = {}, {}, {}
+
     def initialize():
         """
         This function initializes the graph for the Hao-Orlin algorithm.
         """
         # Necessary initialization of the graph
         for i in N:
-            G.nodes[i]['excess'] = 0
+            excess[i] = 0
 
         for (i, j) in G.edges:
-            G.edges[i, j]['flow'] = 0
-            G.edges[j, i]['flow'] = 0
+            flow[i, j] = 0
+            flow[j, i] = 0
 
         # ModifiedInitialize from the paper
         for j in G.neighbors(s):
             push(s, j, forced=True)
 
-        G.nodes[t_prime]['height'] = 0
+        height[t_prime] = 0
 
         for j in N - {t_prime}:
-            G.nodes[j]['height'] = 1
+            height[j] = 1
 
 
     def push(i, j, forced=False):
@@ -36,14 +42,14 @@ def hao_orlin_directed(G, s):
         This function pushes flow from node i to node j. A forced push is a push that saturates all edges emanating from i without stopping when the excess of i is zero.
         """
         if not forced:
-            delta = min(G.nodes[i]['excess'], G.edges[i, j]['capacity'] - G.edges[i, j]['flow']) # TODO: Check if this is correct
+            delta = min(excess[i], G.edges[i, j]['capacity'] - flow[i, j]) # TODO: Check if this is correct
         else:
-            delta = G.edges[i, j]['capacity'] - G.edges[i, j]['flow']
+            delta = G.edges[i, j]['capacity'] - flow[i, j]
 
-        G.edges[i, j]['flow'] += delta
-        G.edges[j, i]['flow'] -= delta
-        G.nodes[i]['excess'] -= delta
-        G.nodes[j]['excess'] += delta
+        flow[i, j] += delta
+        flow[j, i] -= delta
+        excess[i] -= delta
+        excess[j] += delta
 
 
     def relabel(i):
@@ -51,24 +57,24 @@ def hao_orlin_directed(G, s):
         """
         This function relabels the height of node i or moves nodes from the awake set to the dormant set.
         """
-        heights = [G.nodes[j]['height'] for j in awake_nodes]
-        height_counts = {height: heights.count(height) for height in heights}
+        heights = [height[j] for j in awake_nodes]
+        height_counts = {level: heights.count(level) for level in heights}
 
-        if height_counts[G.nodes[i]['height']] == 1:
+        if height_counts[height[i]] == 1:
             D_max += 1
-            R = {j for j in awake_nodes if G.nodes[j]['height'] >= G.nodes[i]['height']}
+            R = {j for j in awake_nodes if height[j] >= height[i]}
             dormant_nodes[D_max].update(R)
             awake_nodes -= R
 
-        elif not any(G.edges[i, j]['capacity'] - G.edges[i, j]['flow'] > 0 for j in G.neighbors(i) if j in awake_nodes):
+        elif not any(G.edges[i, j]['capacity'] - flow[i, j] > 0 for j in G.neighbors(i) if j in awake_nodes):
             D_max += 1
             dormant_nodes[D_max].add(i)
             awake_nodes.remove(i)
 
         else:
-            G.nodes[i]['height'] = 1 + min(G.nodes[j]['height'] for j in G.neighbors(i) if 
+            height[i] = 1 + min(height[j] for j in G.neighbors(i) if 
                                            j in awake_nodes and 
-                                           G.edges[i, j]['capacity'] - G.edges[i, j]['flow'] > 0)
+                                           G.edges[i, j]['capacity'] - flow[i, j] > 0)
 
 
     def calculate_cut_value(S):
@@ -99,7 +105,7 @@ def hao_orlin_directed(G, s):
             dormant_nodes[D_max].clear()
             D_max -= 1
 
-        j = min((j for j in awake_nodes), key=lambda j: G.nodes[j]['height'])
+        j = min((j for j in awake_nodes), key=lambda j: height[j])
         t_prime = j
     
 
@@ -107,14 +113,14 @@ def hao_orlin_directed(G, s):
         """
         Returns the set of active nodes in the graph.
         """
-        return {i for i in (awake_nodes - {t_prime}) if G.nodes[i]['excess'] > 0}
+        return {i for i in (awake_nodes - {t_prime}) if excess[i] > 0}
 
 
     def is_admissable_edge(i, j):
         """
         Returns True if i and j are awake nodes, the edge is not saturated and the height of i is one greater than the height of j.
         """
-        return i in awake_nodes and j in awake_nodes and G.edges[i, j]['capacity'] - G.edges[i, j]['flow'] > 0 and G.nodes[i]['height'] == G.nodes[j]['height'] + 1
+        return i in awake_nodes and j in awake_nodes and G.edges[i, j]['capacity'] - flow[i, j] > 0 and height[i] == height[j] + 1
 
     
     # Initialize variables
@@ -152,5 +158,190 @@ def hao_orlin_directed(G, s):
     return (best_value, best_cut)
 
 
-def hao_orlin(G, s):
-    return hao_orlin_directed(G, s) if G.is_directed() else hao_orlin_directed(G.to_directed(), s)
\ No newline at end of file
+def hao_orlin_network(N: FlowNetwork, s, stats: Stats | None = None, budget: Budget | None = None):
+    """
+    This function implements the Hao-Orlin algorithm on an array-backed flow network. The source is given as node label.
+    Returns the minimum cut among all cuts with s on the source side. The operation counts are added to stats if given.
+    With budget the run raises budget.Cancelled once its deadline has passed or its token has been cancelled.
+    """
+    def push(i, a, forced=False):
+        """
+        This function pushes flow from node i along arc a. A forced push saturates the arc regardless of the excess of i.
+        """
+        nonlocal pushes, saturating_pushes
+        pushes += 1
+        j = heads[a]
+        delta = capacity[a] - flow[a]
+        if not forced and excess[i] < delta:
+            delta = excess[i]
+        else:
+            saturating_pushes += 1
+
+        flow[a] += delta
+        flow[reverse[a]] -= delta
+        excess[i] -= delta
+        excess[j] += delta
+        activate(j)
+
+
+    def activate(j):
+        """
+        This function marks node j as active if it is an awake non-sink node with positive excess.
+        """
+        if awake[j] and j != t_prime and excess[j] > 0 and not is_active[j]:
+            is_active[j] = 1
+            active_nodes.append(j)
+
+
+    def relabel(i):
+        nonlocal D_max, relabels
+        """
+        This function relabels the height of node i or moves nodes from the awake set to the dormant set.
+        """
+        relabels += 1
+        if height_count[height[i]] == 1:
+            D_max += 1
+            R = [j for j in range(n) if awake[j] and height[j] >= height[i]]
+            dormant_nodes.append(R)
+            for j in R:
+                awake[j] = 0
+                height_count[height[j]] -= 1
+            return
+
+        heights = [height[heads[a]] for a in range(offsets[i], offsets[i + 1]) if awake[heads[a]] and capacity[a] - flow[a] > 0]
+        if not heights:
+            D_max += 1
+            dormant_nodes.append([i])
+            awake[i] = 0
+            height_count[height[i]] -= 1
+        else:
+            height_count[height[i]] -= 1
+            height[i] = 1 + min(heights)
+            height_count[height[i]] += 1
+
+
+    def discharge(i):
+        """
+        This function pushes the excess of node i along admissible arcs until it is gone or i has to be relabeled.
+        """
+        nonlocal discharges
+        discharges += 1
+        for a in range(offsets[i], offsets[i + 1]):
+            j = heads[a]
+            if awake[j] and height[i] == height[j] + 1 and capacity[a] - flow[a] > 0:
+                push(i, a)
+                if excess[i] <= 0:
+                    return
+        relabel(i)
+
+
+    def calculate_cut_value():
+        """
+        This function calculates the capacity of all arcs from dormant to awake nodes.
+        """
+        return sum(capacity[a] for i in range(n) if not awake[i] for a in range(offsets[i], offsets[i + 1]) if awake[heads[a]])
+
+
+    def select_new_sink():
+        nonlocal D_max, t_prime
+        """
+        This function selects a new sink for the Hao-Orlin algorithm.
+        """
+        awake[t_prime] = 0
+        height_count[height[t_prime]] -= 1
+        in_S[t_prime] = 1
+        dormant_nodes[0].append(t_prime)
+        old_sink = t_prime
+
+        if len(dormant_nodes[0]) == n:
+            return
+
+        if not any(awake):
+            D_max -= 1
+            for j in dormant_nodes.pop():
+                awake[j] = 1
+                height_count[height[j]] += 1
+
+        t_prime = min((j for j in range(n) if awake[j]), key=lambda j: height[j])
+
+        for a in range(offsets[old_sink], offsets[old_sink + 1]):
+            if not in_S[heads[a]]:
+                push(old_sink, a, forced=True)
+        for j in range(n):
+            activate(j)
+
+
+    # Infinite capacities are bounded, a cut of at least the bound contains an infinite arc
+    B, bound = N.bounded()
+    offsets, heads, reverse, capacity = B.offsets, B.heads, B.reverse, B.capacity
+    flow, excess, height = N.new_state()
+    n = N.n
+    s = N.index[s]
+
+    pushes = saturating_pushes = relabels = discharges = 0
+
+    if n == 1:
+        if stats is not None:
+            stats.add_flow()
+        return (math.inf, N.to_partition([1]))
+
+    # Initialize variables
+    in_S = bytearray(n)
+    in_S[s] = 1
+    awake = bytearray([1]) * n
+    awake[s] = 0
+    dormant_nodes = [[s]]
+    D_max = 0
+    t_prime = 1 if s == 0 else 0
+    height_count = [0] * (2 * n + 1)
+    active_nodes = []
+    is_active = bytearray(n)
+    best_value = math.inf
+    best_awake = None
+
+    # ModifiedInitialize from the paper
+    for j in range(n):
+        height[j] = 0 if j == t_prime else 1
+        if awake[j]:
+            height_count[height[j]] += 1
+    for a in range(offsets[s], offsets[s + 1]):
+        push(s, a, forced=True)
+
+    # Main loop
+    while len(dormant_nodes[0]) < n:
+
+        while active_nodes:
+            i = active_nodes.pop()
+            is_active[i] = 0
+            if not awake[i] or i == t_prime or excess[i] <= 0:
+                continue
+            discharge(i)
+            activate(i)
+            if budget is not None and discharges % budget.CHECK_INTERVAL == 0:
+                budget.check()
+
+        cut_value = calculate_cut_value()
+
+        if cut_value < best_value:
+            best_value = cut_value
+            best_awake = awake[:]
+
+        select_new_sink()
+        if budget is not None:
+            budget.check()
+
+    if stats is not None:
+        stats.add_flow(saturating_pushes, pushes - saturating_pushes, relabels, discharges)
+
+    if bound is not None and best_value >= bound:
+        best_value = math.inf
+
+    return (best_value, N.to_partition([not inside for inside in best_awake]))
+
+
+def hao_orlin(G, s, stats: Stats | None = None, budget: Budget | None = None):
+    """
+    Hao-Orlin wrapper for NetworkX graphs and flow networks. NetworkX graphs are converted to a flow network first.
+    """
+    N = FlowNetwork.prepare(G)
+    return hao_orlin_network(N, s, stats, budget)
\ No newline at end of file
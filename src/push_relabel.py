@@ -1,39 +1,48 @@
 import networkx as nx
 import math
+from array import array
+from collections import deque
+from flow_network import FlowNetwork
+from budget import Budget
+from stats import Stats
 
 
-def push_relabel_directed(G, s, t):
+# Selection rules for the next active node of push_relabel_network
+STRATEGIES = ('fifo', 'highest_label', 'lifo')
+
+
+def push_relabel_directed(G, s, t, sink_side=False):
     """
     Push-relabel algorithm for directed graphs.
+    The preflow, excess and heights are kept in dictionaries, so G is not modified. The partition is the source side of
+    the minimum cut, or the sink side (the nodes that can still reach t) if sink_side is set.
     """
     ACTIVE_NODES = []
+    excess = {v: 0 for v in G.nodes}
+    height = {v: 0 for v in G.nodes}
+    preflow = {}
 
     def initialize():
         """
-        Initializes the graph for the push-relabel algorithm.
+        Initializes the flow state for the push-relabel algorithm.
         """
-        for v in G.nodes:
-            G.nodes[v]['excess'] = 0
-            G.nodes[v]['height'] = 0
-            G.nodes[v]['distance'] = 0 
-        G.nodes[s]['excess'] = math.inf
-        G.nodes[s]['height'] = len(G.nodes)
-        G.nodes[s]['distance'] = len(G.nodes)
-        
+        excess[s] = math.inf
+        height[s] = len(G.nodes)
+
         for u, v in G.edges:
-            G.edges[u, v]['preflow'] = 0
-            G.edges[v, u]['preflow'] = 0
+            preflow[u, v] = 0
+            preflow[v, u] = 0
 
 
     def push(u, v):
         """
         Pushes flow from u to v.
         """
-        send = min(G.nodes[u]['excess'], G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'])
-        G.nodes[u]['excess'] -= send
-        G.nodes[v]['excess'] += send
-        G.edges[u, v]['preflow'] += send
-        G.edges[v, u]['preflow'] -= send
+        send = min(excess[u], G.edges[u, v]['capacity'] - preflow[u, v])
+        excess[u] -= send
+        excess[v] += send
+        preflow[u, v] += send
+        preflow[v, u] -= send
 
         if v != s and v != t:
             ACTIVE_NODES.append(v)
@@ -45,70 +54,279 @@ def push_relabel_directed(G, s, t):
         """
         heights = []
         for v in G.neighbors(u):
-            if G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'] > 0:
-                heights.append(G.nodes[v]['height'])
+            if G.edges[u, v]['capacity'] - preflow[u, v] > 0:
+                heights.append(height[v])
                 min_height = min(heights)
 
-        G.nodes[u]['height'] = min_height + 1
+        height[u] = min_height + 1
 
 
     def discharge(u):
         """
         Discharges the excess flow from node u.
         """
-        while G.nodes[u]['excess'] > 0:
+        while excess[u] > 0:
             for v in G.neighbors(u):
-                if G.nodes[u]['height'] == G.nodes[v]['height'] + 1 and G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'] > 0:
+                if height[u] == height[v] + 1 and G.edges[u, v]['capacity'] - preflow[u, v] > 0:
                     push(u, v)
-                    if G.nodes[u]['excess'] == 0:
+                    if excess[u] == 0:
                         break
                 else:
                     relabel(u)
 
+    initialize()
+
+    # Push preflow from s to neighbors
+    for u in G.neighbors(s):
+        push(s, u)
+
+    # Discharge active nodes
+    while ACTIVE_NODES:
+        u = ACTIVE_NODES.pop()
+        discharge(u)
+
+    # Find S-T partition from the residual graph
+    S, T = residual_partition(G, preflow, s, t, sink_side)
+    cut_value = excess[t]
+
+    return (cut_value, (S, T))
+
+
+def residual_partition(G: nx.DiGraph, preflow: dict, s, t, sink_side=False) -> tuple[set, set]:
+    """
+    Returns the S-T partition of the minimum cut of a maximum preflow of G, given as dictionary of arc flows. S holds the
+    nodes reachable from s over arcs with positive residual capacity, or with sink_side all nodes that cannot reach t.
+    A single search over the residual graph is done and G is not modified.
+    """
+    def residual(u, v):
+        return (G.edges[u, v]['capacity'] if G.has_edge(u, v) else 0) - preflow.get((u, v), 0)
+
+    # Search forwards from s, or backwards from t over the arcs (u, v) that still have residual capacity
+    start = t if sink_side else s
+    reached = {start}
+    stack = [start]
+    while stack:
+        u = stack.pop()
+        for v in set(G.successors(u)) | set(G.predecessors(u)):
+            if v not in reached and (residual(v, u) if sink_side else residual(u, v)) > 0:
+                reached.add(v)
+                stack.append(v)
+
+    if sink_side:
+        return (set(G.nodes) - reached, reached)
+    return (reached, set(G.nodes) - reached)
+
+
+def push_relabel_network(N: FlowNetwork, s, t, stats: Stats | None = None, gap=True, global_relabel_frequency: float | None = 1.0, strategy: str = 'fifo', sink_side=False, budget: Budget | None = None, state: tuple[array, array, array] | None = None):
+    """
+    Push-relabel algorithm on an array-backed flow network. Source and sink are given as node labels.
+    The operation counts are added to stats if given. N itself is only read, so concurrent runs on the same network are
+    safe. The run works on the flow, excess and height arrays of state, fresh ones from N.new_state() by default; a caller
+    that needs the max-flow passes its own state and reads the flow from state[0] afterwards.
+
+    The strategy selects the next active node: 'fifo' and 'lifo' take the oldest or newest node of a queue,
+    'highest_label' takes an active node of maximum height from height buckets. Every active node is held once. A node is
+    discharged along its current arc, which only moves on past non-admissible arcs, until it has no excess or is relabeled.
+
+    With gap, all nodes above a height level that a relabel leaves empty are lifted to n at once, since they cannot
+    reach the sink any more. With global_relabel_frequency, the heights are set to the exact residual distances to the
+    sink by a reverse breadth-first search at the start and after every global_relabel_frequency * n relabels.
+
+    The partition is the source side of the minimum cut, or the sink side if sink_side is set.
+
+    With budget the run raises budget.Cancelled once its deadline has passed or its token has been cancelled.
 
-    def get_saturated_edges():
+    Infinite capacities are bounded (see FlowNetwork.bounded), the value is math.inf if every cut contains an infinite arc.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f'Unknown strategy {strategy!r}, expected one of {STRATEGIES}')
+    # Infinite capacities are bounded, so that no flow becomes infinite and no residual capacity inf - inf
+    B, bound = N.bounded()
+    offsets, heads, reverse, capacity = B.offsets, B.heads, B.reverse, B.capacity
+    flow, excess, height = N.new_state() if state is None else state
+    s, t = N.index[s], N.index[t]
+    n = N.n
+    pushes = saturating_pushes = relabels = discharges = gaps = global_relabels = 0
+
+    # Number of nodes (other than the source) on every height level, heights stay below 2n
+    count = [0] * (2 * n + 1)
+    count[0] = n - 1
+    relabel_period = max(1, int(global_relabel_frequency * n)) if global_relabel_frequency else None
+    next_global_relabel = relabel_period
+
+    # Next arc to try for every node, the arcs before it are not admissible
+    current = list(offsets[:n])
+
+    # Active nodes: the queue of 'fifo' and 'lifo', or one bucket per height for 'highest_label' where a node stays in
+    # the bucket of its height at activation and is moved up when it is found there with a greater height
+    active = [False] * n
+    queue = deque()
+    buckets = [[] for _ in range(2 * n + 1)]
+    top = 0
+
+    def activate(v):
+        nonlocal top
+        if v != s and v != t and not active[v]:
+            active[v] = True
+            if strategy == 'highest_label':
+                buckets[height[v]].append(v)
+                if height[v] > top:
+                    top = height[v]
+            else:
+                queue.append(v)
+
+
+    def next_active():
+        """
+        Removes and returns the next active node, or None if there is none.
+        """
+        nonlocal top
+        if strategy == 'fifo':
+            u = queue.popleft() if queue else None
+        elif strategy == 'lifo':
+            u = queue.pop() if queue else None
+        else:
+            while True:
+                while top >= 0 and not buckets[top]:
+                    top -= 1
+                if top < 0:
+                    return None
+                u = buckets[top].pop()
+                if height[u] == top:
+                    break
+                buckets[height[u]].append(u)
+                top = height[u]
+        if u is not None:
+            active[u] = False
+        return u
+
+
+    def push(u, a):
         """
-        Returns the edges with saturated flow.
+        Pushes flow from u along arc a.
         """
-        return [(u, v) for u, v in G.edges if G.edges[u, v]['preflow'] == G.edges[u, v]['capacity']]
+        nonlocal pushes, saturating_pushes
+        pushes += 1
+        v = heads[a]
+        send = capacity[a] - flow[a]
+        if excess[u] < send:
+            send = excess[u]
+        else:
+            saturating_pushes += 1
+        excess[u] -= send
+        excess[v] += send
+        flow[a] += send
+        flow[reverse[a]] -= send
+        activate(v)
 
 
-    def edge_cuts_to_st_partition(edge_cuts):
+    def relabel(u):
+        """
+        Relabels the height of node u to one more than its lowest residual neighbor.
         """
-        Returns the S-T partition from the edge cuts.
+        nonlocal relabels, gaps
+        relabels += 1
+        old = height[u]
+        height[u] = 1 + min(height[heads[a]] for a in range(offsets[u], offsets[u + 1]) if capacity[a] - flow[a] > 0)
+        current[u] = offsets[u]
+        count[old] -= 1
+        count[height[u]] += 1
+
+        # Gap heuristic: no node is left on level old, so the nodes above it are cut off from the sink
+        if gap and count[old] == 0 and old < n:
+            gaps += 1
+            for v in range(n):
+                if v != s and old < height[v] < n:
+                    count[height[v]] -= 1
+                    height[v] = n
+                    count[n] += 1
+                    current[v] = offsets[v]
+
+
+    def global_relabel():
         """
-        for u, v in edge_cuts:
-            G.remove_edge(u, v)
-        
-        S = set([u for u in G.nodes if nx.has_path(G, s, u)])
-        T = set(G.nodes) - S
+        Sets the heights to the residual distances to the sink. Nodes that cannot reach the sink are lifted to n.
+        """
+        nonlocal global_relabels
+        global_relabels += 1
+        distance = [-1] * n
+        distance[t] = 0
+        bfs = [t]
+        for w in bfs:
+            for a in range(offsets[w], offsets[w + 1]):
+                v = heads[a]
+                if distance[v] < 0 and capacity[reverse[a]] - flow[reverse[a]] > 0:
+                    distance[v] = distance[w] + 1
+                    bfs.append(v)
+
+        count[:] = [0] * (2 * n + 1)
+        for v in range(n):
+            if v != s:
+                height[v] = distance[v] if 0 <= distance[v] < n else max(height[v], n)
+                count[height[v]] += 1
+        current[:] = offsets[:n]
 
-        return (S, T)
 
-    initialize()
+    def discharge(u):
+        """
+        Pushes the excess of node u along admissible arcs until it is gone or u has to be relabeled.
+        """
+        nonlocal discharges
+        discharges += 1
+        end = offsets[u + 1]
+        while excess[u] > 0:
+            a = current[u]
+            if a == end:
+                relabel(u)
+                activate(u)
+                return
+            if height[u] == height[heads[a]] + 1 and capacity[a] - flow[a] > 0:
+                push(u, a)
+            else:
+                current[u] = a + 1
+
+    # Initialize source
+    excess[s] = math.inf
+    height[s] = n
 
     # Push preflow from s to neighbors
-    for u in G.neighbors(s):
-        push(s, u)
+    for a in range(offsets[s], offsets[s + 1]):
+        if capacity[a] - flow[a] > 0:
+            push(s, a)
+    if relabel_period is not None:
+        global_relabel()
 
     # Discharge active nodes
-    while ACTIVE_NODES:
-        u = ACTIVE_NODES.pop()
+    if budget is not None:
+        budget.check()
+    while (u := next_active()) is not None:
         discharge(u)
-
-    # Find S-T partition from saturated edges
-    saturated_edges = get_saturated_edges()
-    S, T = edge_cuts_to_st_partition(saturated_edges)
-    cut_value = G.nodes[t]['excess'] 
+        if budget is not None and discharges % budget.CHECK_INTERVAL == 0:
+            budget.check()
+        if relabel_period is not None and relabels >= next_global_relabel:
+            global_relabel()
+            next_global_relabel = relabels + relabel_period
+
+    # Find S-T partition from the residual network
+    S, T = B.to_partition(B.source_side(s, flow) if not sink_side else B.sink_side(t, flow))
+    cut_value = excess[t]
+    if stats is not None:
+        stats.add_flow(saturating_pushes, pushes - saturating_pushes, relabels, discharges)
+        stats.add('gaps', gaps)
+        stats.add('global_relabels', global_relabels)
+
+    if bound is not None and cut_value >= bound:
+        cut_value = math.inf
 
     return (cut_value, (S, T))
 
 
-def push_relabel(G, s, t):
+def push_relabel(G, s, t, stats: Stats | None = None, gap=True, global_relabel_frequency: float | None = 1.0, strategy: str = 'fifo', sink_side=False, budget: Budget | None = None):
     """
-    Push-relabel wrapper for undirected graphs.
+    Push-relabel wrapper for NetworkX graphs and flow networks. NetworkX graphs are converted to a flow network first.
     """
-    return push_relabel_directed(G, s, t) if G.is_directed() else push_relabel_directed(G.to_directed(), s, t)
+    N = FlowNetwork.prepare(G)
+    return push_relabel_network(N, s, t, stats, gap, global_relabel_frequency, strategy, sink_side, budget)
 
 
 if __name__ == '__main__':
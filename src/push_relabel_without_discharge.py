@@ -4,39 +4,42 @@ import time
 import cProfile
 from collections import Counter
 import matplotlib.pyplot as plt
+from flow_network import FlowNetwork
+from push_relabel import residual_partition
+from stats import Stats
 
-def push_relabel_directed(G, s, t):
+def push_relabel_directed(G, s, t, sink_side=False):
     """
     Push-relabel algorithm for directed graphs.
+    The preflow, excess and heights are kept in dictionaries, so G is not modified. The partition is the source side of
+    the minimum cut, or the sink side (the nodes that can still reach t) if sink_side is set.
     """
     ACTIVE_NODES = []
+    excess = {v: 0 for v in G.nodes}
+    height = {v: 0 for v in G.nodes}
+    preflow = {}
 
     def initialize():
         """
-        Initializes the graph for the push-relabel algorithm.
+        Initializes the flow state for the push-relabel algorithm.
         """
-        for v in G.nodes:
-            G.nodes[v]['excess'] = 0
-            G.nodes[v]['height'] = 0
-            G.nodes[v]['distance'] = 0 
-        G.nodes[s]['excess'] = math.inf
-        G.nodes[s]['height'] = len(G.nodes)
-        G.nodes[s]['distance'] = len(G.nodes)
-        
+        excess[s] = math.inf
+        height[s] = len(G.nodes)
+
         for u, v in G.edges:
-            G.edges[u, v]['preflow'] = 0
-            G.edges[v, u]['preflow'] = 0
+            preflow[u, v] = 0
+            preflow[v, u] = 0
 
 
     def push(u, v):
         """
         Pushes flow from u to v.
         """
-        send = min(G.nodes[u]['excess'], G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'])
-        G.nodes[u]['excess'] -= send
-        G.nodes[v]['excess'] += send
-        G.edges[u, v]['preflow'] += send
-        G.edges[v, u]['preflow'] -= send
+        send = min(excess[u], G.edges[u, v]['capacity'] - preflow[u, v])
+        excess[u] -= send
+        excess[v] += send
+        preflow[u, v] += send
+        preflow[v, u] -= send
 
 
         if v != s and v != t:
@@ -49,11 +52,11 @@ def push_relabel_directed(G, s, t):
         """
         heights = []
         for v in G.neighbors(u):
-            if G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'] > 0:
-                heights.append(G.nodes[v]['height'])
+            if G.edges[u, v]['capacity'] - preflow[u, v] > 0:
+                heights.append(height[v])
                 min_height = min(heights)
 
-        G.nodes[u]['height'] = min_height + 1
+        height[u] = min_height + 1
 
 
     def single_push_relabel_operation(u):
@@ -61,57 +64,120 @@ def push_relabel_directed(G, s, t):
         Single push-relabel operation on node u.
         """
         for v in G.neighbors(u):
-            if G.nodes[u]['height'] == G.nodes[v]['height'] + 1 and G.edges[u, v]['capacity'] - G.edges[u, v]['preflow'] > 0:
+            if height[u] == height[v] + 1 and G.edges[u, v]['capacity'] - preflow[u, v] > 0:
                 push(u, v)
                 return
         relabel(u)
 
+    initialize()
+
+    # Push preflow from s to neighbors
+    for u in G.neighbors(s):
+        push(s, u)
+
+    # Discharge active nodes
+    while ACTIVE_NODES:
+        u = ACTIVE_NODES.pop()
+        single_push_relabel_operation(u)
+        if excess[u] > 0:
+            ACTIVE_NODES.append(u)
+
+    # Find S-T partition from the residual graph
+    S, T = residual_partition(G, preflow, s, t, sink_side)
+    cut_value = excess[t]
+
+    return (cut_value, (S, T))
+
+
+def push_relabel_network(N: FlowNetwork, s, t, stats: Stats | None = None, sink_side=False):
+    """
+    Push-relabel algorithm without discharge on an array-backed flow network. Source and sink are given as node labels.
+    The operation counts are added to stats if given. The partition is the source side of the minimum cut, or the sink
+    side if sink_side is set. Infinite capacities are bounded (see FlowNetwork.bounded), the value is math.inf if every
+    cut contains an infinite arc.
+    """
+    B, bound = N.bounded()
+    offsets, heads, reverse, capacity = B.offsets, B.heads, B.reverse, B.capacity
+    flow, excess, height = N.new_state()
+    s, t = N.index[s], N.index[t]
+    ACTIVE_NODES = []
+    pushes = saturating_pushes = relabels = 0
 
-    def get_saturated_edges():
+    def push(u, a):
         """
-        Returns the edges with saturated flow.
+        Pushes flow from u along arc a.
         """
-        return [(u, v) for u, v in G.edges if G.edges[u, v]['preflow'] == G.edges[u, v]['capacity']]
+        nonlocal pushes, saturating_pushes
+        pushes += 1
+        v = heads[a]
+        send = capacity[a] - flow[a]
+        if excess[u] < send:
+            send = excess[u]
+        else:
+            saturating_pushes += 1
+        excess[u] -= send
+        excess[v] += send
+        flow[a] += send
+        flow[reverse[a]] -= send
+
+        if v != s and v != t:
+            ACTIVE_NODES.append(v)
 
 
-    def edge_cuts_to_st_partition(edge_cuts):
+    def relabel(u):
         """
-        Returns the S-T partition from the edge cuts.
+        Relabels the height of node u to one more than its lowest residual neighbor.
         """
-        for u, v in edge_cuts:
-            G.remove_edge(u, v)
-        
-        S = set([u for u in G.nodes if nx.has_path(G, s, u)])
-        T = set(G.nodes) - S
+        nonlocal relabels
+        relabels += 1
+        height[u] = 1 + min(height[heads[a]] for a in range(offsets[u], offsets[u + 1]) if capacity[a] - flow[a] > 0)
 
-        return (S, T)
 
-    initialize()
+    def single_push_relabel_operation(u):
+        """
+        Single push-relabel operation on node u.
+        """
+        for a in range(offsets[u], offsets[u + 1]):
+            if height[u] == height[heads[a]] + 1 and capacity[a] - flow[a] > 0:
+                push(u, a)
+                return
+        relabel(u)
+
+    # Initialize source
+    excess[s] = math.inf
+    height[s] = N.n
 
     # Push preflow from s to neighbors
-    for u in G.neighbors(s):
-        push(s, u)
+    for a in range(offsets[s], offsets[s + 1]):
+        push(s, a)
 
-    # Discharge active nodes
+    # Apply push or relabel operations to active nodes
     while ACTIVE_NODES:
         u = ACTIVE_NODES.pop()
+        if excess[u] <= 0:
+            continue
         single_push_relabel_operation(u)
-        if G.nodes[u]['excess'] > 0:
+        if excess[u] > 0:
             ACTIVE_NODES.append(u)
 
-    # Find S-T partition from saturated edges
-    saturated_edges = get_saturated_edges()
-    S, T = edge_cuts_to_st_partition(saturated_edges)
-    cut_value = G.nodes[t]['excess'] 
+    # Find S-T partition from the residual network
+    S, T = B.to_partition(B.source_side(s, flow) if not sink_side else B.sink_side(t, flow))
+    cut_value = excess[t]
+    if stats is not None:
+        stats.add_flow(saturating_pushes, pushes - saturating_pushes, relabels)
+
+    if bound is not None and cut_value >= bound:
+        cut_value = math.inf
 
     return (cut_value, (S, T))
 
 
-def push_relabel(G, s, t):
+def push_relabel(G, s, t, stats: Stats | None = None, sink_side=False):
     """
-    Push-relabel wrapper for undirected graphs.
+    Push-relabel wrapper for NetworkX graphs and flow networks. NetworkX graphs are converted to a flow network first.
     """
-    return push_relabel_directed(G, s, t) if G.is_directed() else push_relabel_directed(G.to_directed(), s, t)
+    N = FlowNetwork.prepare(G)
+    return push_relabel_network(N, s, t, stats, sink_side)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+"""
+This file contains the optional instrumentation object of the flow and enumeration engines.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator
+
+
+class Stats:
+    """
+    Operation counters, high-water marks and per-phase wall times of an instrumented run.
+
+    Pass an instance as stats= to push_relabel, hao_orlin, varizani_yannakakis or the cut-basis routines and read it
+    afterwards, or give it a callback that receives as_dict() when a top-level routine finishes. The engines count in
+    local variables and add their totals once per call, so a run without stats does no extra work in its inner loops.
+
+    Counters: pushes (saturating_pushes + non_saturating_pushes), relabels, discharges, gaps and global_relabels
+    (push_relabel heuristics), flow_calls (max-flow and Hao-Orlin runs), contractions, cuts, dependency_checks,
+    pruned_entries, spilled_entries and run_merges (VY queue), checkpoints.
+    Maxima: queue_size. Phases (seconds): see the instrumented routines.
+    """
+    def __init__(self, callback: Callable[[dict], None] | None = None):
+        self.counts: dict[str, int] = {}
+        self.maxima: dict[str, int] = {}
+        self.timings: dict[str, float] = {}
+        self.callback = callback
+
+    def add(self, name: str, value: int = 1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def maximum(self, name: str, value: int):
+        if name not in self.maxima or value > self.maxima[name]:
+            self.maxima[name] = value
+
+    def add_time(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Adds the wall time of the with-block to the phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_flow(self, saturating_pushes: int = 0, non_saturating_pushes: int = 0, relabels: int = 0, discharges: int = 0):
+        """
+        Adds the operation counts of one max-flow or Hao-Orlin run.
+        """
+        self.add('flow_calls')
+        self.add('pushes', saturating_pushes + non_saturating_pushes)
+        self.add('saturating_pushes', saturating_pushes)
+        self.add('non_saturating_pushes', non_saturating_pushes)
+        self.add('relabels', relabels)
+        self.add('discharges', discharges)
+
+    def merge(self, other: 'Stats | dict'):
+        """
+        Adds the counters and timings of another run (e.g. of a worker process) and keeps the larger maxima.
+        """
+        other = other if isinstance(other, dict) else other.as_dict()
+        for name, value in other['counts'].items():
+            self.add(name, value)
+        for name, value in other['maxima'].items():
+            self.maximum(name, value)
+        for name, value in other['timings'].items():
+            self.add_time(name, value)
+
+    def as_dict(self) -> dict:
+        return {'counts': dict(self.counts), 'maxima': dict(self.maxima), 'timings': dict(self.timings)}
+
+    def emit(self):
+        if self.callback is not None:
+            self.callback(self.as_dict())
+
+
+def phase(stats: Stats | None, name: str):
+    """
+    Times a with-block as phase name of stats, or does nothing if stats is None.
+    """
+    return stats.phase(name) if stats is not None else nullcontext()
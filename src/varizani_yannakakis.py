@@ -1,10 +1,21 @@
 import networkx as nx
+import numpy as np
 from networkx.algorithms.flow import edmonds_karp, minimum_cut
+import heapq
 import math
-from queue import PriorityQueue
-from typing import Tuple, Union
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterator, Tuple, Union
 import cut_bases as cb
 import fast_gauss as fg
+import hao_orlin_original as ho
+import push_relabel as pr
+from flow_network import FlowNetwork
+from budget import Budget, CancelToken, Cancelled
+from stats import Stats, phase
 
 
 # Type definitions congruent with output of min_cut method in networkx (tuple of mi-cut value and ST-partition)
@@ -12,55 +23,438 @@ type NodeSet = set
 type Cut_value = Union[int, float]
 type ST_partition = Tuple[NodeSet, NodeSet]
 
+# Partition vectors are int bitmasks over the node order of the graph together with the number of specified nodes.
+# Bit i is set if the i-th node is in T, so the string view '0110' of 4 nodes is the bitmask 0b0110 read from bit 0 upwards.
+type Vector = Tuple[int, int]
 
-# Wrapper class for the cut data to be used in the priority queue
+
+class CutLabels:
+    """
+    Node labels of the graph of one enumeration, shared by all of its cuts so that a cut only has to keep int masks.
+    The edges are only listed once the edge set of a cut is asked for.
+    """
+    __slots__ = ('nodes', 'graph', '_edges')
+
+    def __init__(self, G: nx.DiGraph | FlowNetwork):
+        self.nodes = list(G.nodes)
+        self.graph = G
+        self._edges = None
+
+    @property
+    def edges(self) -> list[tuple]:
+        if self._edges is None:
+            if isinstance(self.graph, nx.Graph):
+                self._edges = list(self.graph.edges())
+            else:
+                # Arcs of positive capacity are the edges of a flow network, their zero capacity partners are residual only
+                N = self.graph
+                self._edges = [(N.labels[u], N.labels[N.heads[a]]) for u in range(N.n) for a in range(N.offsets[u], N.offsets[u + 1]) if N.capacity[a] > 0]
+        return self._edges
+
+
+# Record of a cut in the priority queue: the value, the node mask of T and the mother vector of the VY tree node.
+# The ST-partition, the string vectors and the edge set are computed from the masks on demand.
 class Cut:
-    def __init__(self, value, data):
+    __slots__ = ('value', 'mask', 'mother_mask', 'mother_length', 'labels')
+
+    def __init__(self, value: Cut_value, mask: int, mother: Vector, labels: CutLabels):
         self.value: Cut_value = value
-        self.st_partition: ST_partition = data['st_partition']
-        self.partition_vector: str = data['partition_vector']
-        self.mother: str = data['mother']
+        self.mask = mask
+        self.mother_mask, self.mother_length = mother
+        self.labels = labels
 
     def __lt__(self, other):
+        # A lazy child of equal value may turn out larger, so the cut is taken first
+        if isinstance(other, PendingCut):
+            return self.value <= other.value
         return self.value < other.value
 
+    def __getstate__(self):
+        # The labels are shared and not sent along, e.g. from a worker process; the receiver sets its own
+        return None, {'value': self.value, 'mask': self.mask, 'mother_mask': self.mother_mask, 'mother_length': self.mother_length, 'labels': None}
 
-def cut_to_vector(G: nx.DiGraph, cut: ST_partition) -> str:
+    @property
+    def partition(self) -> Vector:
+        return self.mask, len(self.labels.nodes)
+
+    @property
+    def mother(self) -> Vector:
+        return self.mother_mask, self.mother_length
+
+    @property
+    def st_partition(self) -> ST_partition:
+        S, T = set(), set()
+        for i, node in enumerate(self.labels.nodes):
+            (T if self.mask >> i & 1 else S).add(node)
+        return S, T
+
+    @property
+    def partition_vector(self) -> str:
+        return mask_to_vector(*self.partition)
+
+    @property
+    def mother_vector(self) -> str:
+        return mask_to_vector(*self.mother)
+
+    @property
+    def edge_partition(self) -> set:
+        """
+        Edges with one endpoint on either side of the cut, like cut_bases.cut_partition_to_edge_partition.
+        """
+        index = {node: i for i, node in enumerate(self.labels.nodes)}
+        return {(u, v) for u, v in self.labels.edges if (self.mask >> index[u] ^ self.mask >> index[v]) & 1}
+
+
+class PendingCut:
     """
-    Given a graph G and a cut, return the vector representation of the cut as string.
+    Child of a cut whose min cut has not been computed yet. It is queued with the value of its parent cut, which is a
+    lower bound of the min cut of the child, and replaced by the Cut of the child once it reaches the head of the queue.
+    """
+    __slots__ = ('value', 'mother')
+
+    def __init__(self, value: Cut_value, mother: Vector):
+        self.value = value
+        self.mother = mother
+
+    def __lt__(self, other):
+        return self.value < other.value
+
+
+class CutQueue:
+    """
+    Priority queue of the VY enumeration. Entries are ordered by value, then cuts before pending cuts of equal value,
+    pending cuts by the length of their mother vector (the least constrained child is the most likely to keep the value
+    of its parent) and then by insertion, so the order of equal entries does not depend on the heap layout.
+
+    With max_cuts only the entries that can still be among the first max_cuts popped cuts are kept: once the queue
+    holds enough cuts, entries ordered behind the last of them are discarded, and so are later pushes behind it. The
+    subtree of an entry has no smaller values and is inserted later, so nothing it produces could be popped earlier.
+    Entries with a value greater than max_value are discarded right away.
+
+    With memory_limit at most that many entries are kept in memory: when it is exceeded, the larger half of the entries
+    is written as a sorted run file to spill_dir (the system temporary directory by default) and merged back on pop.
+    Once there are more than MAX_RUNS run files, the smaller half of them is merged into one, so the number of open files
+    and of run heads in memory stays bounded however often the queue spills, while large runs are rarely rewritten.
+    """
+    # Number of run files above which the smaller runs are merged
+    MAX_RUNS = 64
+
+    def __init__(self, labels: CutLabels, max_cuts: int | None = None, max_value: Cut_value | None = None, memory_limit: int | None = None, spill_dir: str | None = None, stats: Stats | None = None):
+        self.labels = labels
+        self.heap = []
+        self.counter = 0
+        self.remaining = max_cuts
+        self.cutoff = (max_value, 1, math.inf, math.inf) if max_value is not None else None
+        self.prune_at = 2 * max_cuts if max_cuts is not None else math.inf
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        # Open run files with their current head entry and number of unread entries, merged by a heap of (head key, run)
+        self.runs = {}
+        self.run_heads = []
+        self.spilled = 0
+        self.stats = stats
+
+    def __len__(self) -> int:
+        return len(self.heap) + self.spilled
+
+    def push(self, entry: 'Cut | PendingCut'):
+        key = (entry.value, 1, entry.mother[1], self.counter) if isinstance(entry, PendingCut) else (entry.value, 0, 0, self.counter)
+        self.counter += 1
+        if self.cutoff is not None and key > self.cutoff:
+            self._count('pruned_entries')
+            return
+        heapq.heappush(self.heap, (*key, entry))
+        if len(self.heap) > self.prune_at:
+            self.prune()
+        if self.memory_limit is not None and len(self.heap) > self.memory_limit:
+            self.spill()
+
+    def pop(self) -> 'Cut | PendingCut':
+        if self.run_heads and (not self.heap or self.run_heads[0][0] < self.heap[0][:4]):
+            entry = self._pop_run()
+        else:
+            entry = heapq.heappop(self.heap)[4]
+        if self.remaining is not None and isinstance(entry, Cut):
+            self.remaining -= 1
+
+        return entry
+
+    def prune(self):
+        """
+        Discards the entries in memory ordered behind the first remaining cuts and lowers the cutoff for later pushes.
+        """
+        cut_keys = heapq.nsmallest(self.remaining, (item[:4] for item in self.heap if item[1] == 0))
+        if self.remaining > 0 and len(cut_keys) == self.remaining and (self.cutoff is None or cut_keys[-1] < self.cutoff):
+            self.cutoff = cut_keys[-1]
+            size = len(self.heap)
+            self.heap = [item for item in self.heap if item[:4] <= self.cutoff]
+            heapq.heapify(self.heap)
+            self._count('pruned_entries', size - len(self.heap))
+        self.prune_at = 2 * max(len(self.heap), self.remaining)
+
+    def spill(self):
+        """
+        Writes the larger half of the entries in memory to a sorted run file.
+        """
+        self.heap.sort()
+        half = len(self.heap) // 2
+        run = tempfile.TemporaryFile(dir=self.spill_dir)
+        for item in self.heap[half:]:
+            pickle.dump(item, run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        self.runs[id(run)] = [run, len(self.heap) - half]
+        self.spilled += len(self.heap) - half
+        self._count('spilled_entries', len(self.heap) - half)
+        del self.heap[half:]
+        self._next_run_head(run)
+        if len(self.runs) > self.MAX_RUNS:
+            self.merge_runs(len(self.runs) // 2 + 1)
+
+    def merge_runs(self, number: int):
+        """
+        Merges the given number of runs with the fewest unread entries into one sorted run file, reading one entry per run
+        at a time.
+        """
+        def run_items(head, run, count):
+            yield head
+            for _ in range(count - 1):
+                yield pickle.load(run)
+
+        merging = set(sorted(self.runs, key=lambda run_id: self.runs[run_id][1])[:number])
+        heads = [(run_id, item) for _, run_id, item in self.run_heads if run_id in merging]
+        self.run_heads = [head for head in self.run_heads if head[1] not in merging]
+        heapq.heapify(self.run_heads)
+
+        merged = tempfile.TemporaryFile(dir=self.spill_dir)
+        count = 0
+        for item in heapq.merge(*(run_items(item, *self.runs[run_id]) for run_id, item in heads), key=lambda item: item[:4]):
+            pickle.dump(item, merged, pickle.HIGHEST_PROTOCOL)
+            count += 1
+        merged.seek(0)
+        for run_id in merging:
+            self.runs.pop(run_id)[0].close()
+        self.runs[id(merged)] = [merged, count]
+        self._count('run_merges')
+        self._next_run_head(merged)
+
+    def items(self) -> Iterator[tuple]:
+        """
+        Yields the (value, rank, priority, counter, entry) items of all queued entries, in memory and spilled, unordered.
+        """
+        yield from self.heap
+        for _, run_id, item in self.run_heads:
+            yield item
+            run, count = self.runs[run_id]
+            position = run.tell()
+            for _ in range(count - 1):
+                yield pickle.load(run)
+            run.seek(position)
+
+    def restore(self, items: list[tuple], counter: int, remaining: int | None, cutoff: tuple | None):
+        """
+        Replaces the queued entries and the ordering state by those of an earlier queue (see save_checkpoint).
+        """
+        self.close()
+        self.heap = list(items)
+        heapq.heapify(self.heap)
+        self.counter, self.remaining, self.cutoff = counter, remaining, cutoff
+        self.prune_at = 2 * max(len(self.heap), remaining) if remaining is not None else math.inf
+        while self.memory_limit is not None and len(self.heap) > self.memory_limit:
+            self.spill()
+
+    def close(self):
+        for run, _ in self.runs.values():
+            run.close()
+        self.runs.clear()
+        self.run_heads.clear()
+        self.spilled = 0
+
+    def _pop_run(self) -> 'Cut | PendingCut':
+        _, run_id, item = heapq.heappop(self.run_heads)
+        run = self.runs[run_id]
+        run[1] -= 1
+        self.spilled -= 1
+        self._next_run_head(run[0])
+        entry = item[4]
+        if isinstance(entry, Cut):
+            entry.labels = self.labels
+
+        return entry
+
+    def _next_run_head(self, run):
+        count = self.runs[id(run)][1]
+        if count > 0:
+            item = pickle.load(run)
+            # A sorted run can be dropped as a whole once its head is behind the cutoff
+            if self.cutoff is None or item[:4] <= self.cutoff:
+                heapq.heappush(self.run_heads, (item[:4], id(run), item))
+                return
+            self._count('pruned_entries', count)
+            self.spilled -= count
+        run.close()
+        del self.runs[id(run)]
+
+    def _count(self, name: str, value: int = 1):
+        if self.stats is not None:
+            self.stats.add(name, value)
+
+
+def cut_dtype(n: int) -> np.dtype:
+    """
+    Returns the structured dtype of cuts over n nodes: the value and the partition and mother masks as little-endian bytes.
+    """
+    width = max(1, -(-n // 8))
+    return np.dtype([('value', 'f8'), ('partition', 'u1', (width,)), ('mother', 'u1', (width,)), ('mother_length', 'u4')])
+
+
+def cuts_to_array(cuts: list[Cut], n: int) -> np.ndarray:
+    """
+    Packs cuts over n nodes into a structured array of cut_dtype(n).
+    """
+    dtype = cut_dtype(n)
+    width = dtype['partition'].shape[0]
+    packed = np.zeros(len(cuts), dtype)
+    packed['value'] = [cut.value for cut in cuts]
+    packed['mother_length'] = [cut.mother_length for cut in cuts]
+    for field, masks in (('partition', [cut.mask for cut in cuts]), ('mother', [cut.mother_mask for cut in cuts])):
+        packed[field] = np.frombuffer(b''.join(mask.to_bytes(width, 'little') for mask in masks), np.uint8).reshape(len(cuts), width)
+
+    return packed
+
+
+def array_to_cuts(packed: np.ndarray, labels: CutLabels) -> list[Cut]:
+    """
+    Unpacks a structured array of cuts_to_array into cuts over the nodes of labels (values are returned as floats).
+    """
+    return [Cut(float(row['value']), int.from_bytes(row['partition'].tobytes(), 'little'), (int.from_bytes(row['mother'].tobytes(), 'little'), int(row['mother_length'])), labels)
+            for row in packed]
+
+
+def checkpoint_dtype(n: int) -> np.dtype:
+    """
+    Returns the structured dtype of queue entries over n nodes in a checkpoint: the fields of cut_dtype(n) together with
+    the ordering key of the entry and whether its value is an int.
+    """
+    return np.dtype(cut_dtype(n).descr + [('pending', '?'), ('counter', 'i8'), ('integral', '?')])
+
+
+def save_checkpoint(path: str, network: FlowNetwork, queue: CutQueue, emitted_cuts: int, options: tuple):
+    """
+    Writes the state of an enumeration to a compressed NumPy archive: the queued cuts and pending cuts with their
+    ordering keys, the counters of the queue, the number of emitted cuts, the options of the run and the fingerprint of
+    its network. The file is replaced atomically, so a crash leaves the last one intact.
+    """
+    dtype = checkpoint_dtype(network.n)
+    width = dtype['partition'].shape[0]
+    items = list(queue.items())
+    entries = np.zeros(len(items), dtype)
+    for row, (value, rank, _, counter, entry) in zip(entries, items):
+        mother = entry.mother
+        row['value'], row['pending'], row['counter'], row['integral'] = value, rank == 1, counter, isinstance(value, int)
+        row['mother'] = np.frombuffer(mother[0].to_bytes(width, 'little'), np.uint8)
+        row['mother_length'] = mother[1]
+        if rank == 0:
+            row['partition'] = np.frombuffer(entry.mask.to_bytes(width, 'little'), np.uint8)
+    cutoff = queue.cutoff if queue.cutoff is not None else (math.nan,) * 4
+
+    with open(path + '.tmp', 'wb') as file:
+        np.savez_compressed(file, entries=entries,
+                            counters=np.array([queue.counter, -1 if queue.remaining is None else queue.remaining, emitted_cuts], dtype=np.int64),
+                            cutoff=np.array(cutoff, dtype=np.float64), options=np.array(options, dtype=np.float64),
+                            fingerprint=np.array(network.fingerprint()))
+    os.replace(path + '.tmp', path)
+
+
+def load_checkpoint(path: str, network: FlowNetwork, labels: CutLabels, queue: CutQueue, options: tuple) -> int:
+    """
+    Restores the queue of an enumeration from a checkpoint of save_checkpoint and returns the number of cuts it had
+    emitted. Raises ValueError if the checkpoint belongs to another network or was written with other options.
     """
-    vector = ''
-    for node in G.nodes:
-        if node in cut[0]:
-            # Node is in S
-            vector += '0'
+    with np.load(path) as checkpoint:
+        if str(checkpoint['fingerprint']) != network.fingerprint():
+            raise ValueError(f'{path} is a checkpoint of another graph')
+        if not np.array_equal(checkpoint['options'], np.array(options, dtype=np.float64), equal_nan=True):
+            raise ValueError(f'{path} was written with other options (lazy, brute_force, max_cuts, max_value)')
+        entries = checkpoint['entries']
+        counter, remaining, emitted_cuts = (int(x) for x in checkpoint['counters'])
+        cutoff = tuple(float(x) for x in checkpoint['cutoff'])
+
+    items = []
+    for row in entries:
+        value = int(row['value']) if row['integral'] else float(row['value'])
+        mother = (int.from_bytes(row['mother'].tobytes(), 'little'), int(row['mother_length']))
+        if row['pending']:
+            items.append((value, 1, mother[1], int(row['counter']), PendingCut(value, mother)))
         else:
-            # Node is in T
-            vector += '1'
+            items.append((value, 0, 0, int(row['counter']), Cut(value, int.from_bytes(row['partition'].tobytes(), 'little'), mother, labels)))
+    queue.restore(items, counter, None if remaining < 0 else remaining, None if math.isnan(cutoff[0]) else cutoff)
+
+    return emitted_cuts
+
+
+def vector_to_mask(vector: str) -> Vector:
+    """
+    Given the string representation of a (partial) partition vector, return its bitmask and length.
+    """
+    return int(vector[::-1], 2) if vector else 0, len(vector)
+
+
+def mask_to_vector(mask: int, length: int) -> str:
+    """
+    Given the bitmask and length of a (partial) partition vector, return its string representation.
+    """
+    return format(mask, f'0{length}b')[::-1] if length else ''
+
+
+def cut_to_mask(G: nx.DiGraph, cut: ST_partition) -> Vector:
+    """
+    Given a graph G and a cut, return the bitmask representation of the cut (bits of nodes in T are set).
+    """
+    S = cut[0]
+    mask = 0
+    for i, node in enumerate(G.nodes):
+        if node not in S:
+            mask |= 1 << i
 
-    return vector
+    return mask, G.number_of_nodes()
 
 
-def get_immediate_children(internal_vector: str, leaf_vector: str) -> list[str]:
+def cut_to_vector(G: nx.DiGraph, cut: ST_partition) -> str:
+    """
+    Given a graph G and a cut, return the vector representation of the cut as string.
+    """
+    return mask_to_vector(*cut_to_mask(G, cut))
+
+
+def get_immediate_children(internal_vector: Vector, leaf_vector: Vector) -> list[Vector]:
     """
     Given the vector of an internal node and a leaf node, return the immediate children of the path from internal node to leaf node.
+    The children are ordered from the longest to the shortest prefix.
     """
+    leaf_mask, leaf_length = leaf_vector
     children = []
-    leaf_binary = int(f'{leaf_vector}', 2)
-    for i in range(len(leaf_vector) - len(internal_vector)):
-        child = format(leaf_binary ^ 2 ** i, f'0{len(leaf_vector)}b')
-        if i != 0:
-            children.append(child[:-i])
-        else:
-            children.append(child)
+    for i in range(leaf_length - 1, internal_vector[1] - 1, -1):
+        # Keep the first i nodes of the leaf and flip the side of node i
+        children.append(((leaf_mask ^ (1 << i)) & ((2 << i) - 1), i + 1))
 
     return children
 
 
-def minimum_s_cut(G: nx.DiGraph, fixed_s) -> Tuple[Cut_value, ST_partition]:
+def as_network(G: nx.DiGraph | FlowNetwork) -> FlowNetwork:
+    """
+    Returns the flow network of G, or G itself if it already is a flow network.
+    """
+    return FlowNetwork.prepare(G)
+
+
+def minimum_s_cut(G: nx.DiGraph, fixed_s, brute_force=False, stats: Stats | None = None, budget: Budget | None = None) -> Tuple[Cut_value, ST_partition]:
     """
     Given a graph G and a fixed source node, return the min cut of the graph with the fixed node.
+    A single Hao-Orlin run is used unless brute_force is set, in which case one max-flow per other node is computed.
     """
+    if not brute_force:
+        return ho.hao_orlin(G, fixed_s, stats, budget)
+
     nodes = list(G.nodes)
     nodes.remove(fixed_s)
     min_cut_value = math.inf
@@ -73,10 +467,16 @@ def minimum_s_cut(G: nx.DiGraph, fixed_s) -> Tuple[Cut_value, ST_partition]:
     return min_cut_value, st_partition
 
 
-def minimum_t_cut(G: nx.DiGraph, fixed_t) -> Tuple[Cut_value, ST_partition]:
+def minimum_t_cut(G: nx.DiGraph, fixed_t, brute_force=False, stats: Stats | None = None, budget: Budget | None = None) -> Tuple[Cut_value, ST_partition]:
     """
     Given a graph G and a fixed sink node, return the min cut of the graph with the fixed node.
+    A single Hao-Orlin run on the reversed network is used unless brute_force is set, in which case one max-flow per other node is computed.
     """
+    if not brute_force:
+        # A source side of the reversed network is a sink side of the original one
+        min_cut_value, (T, S) = ho.hao_orlin(as_network(G).reversed(), fixed_t, stats, budget)
+        return min_cut_value, (S, T)
+
     nodes = list(G.nodes)
     nodes.remove(fixed_t)
     min_cut_value = math.inf
@@ -89,7 +489,7 @@ def minimum_t_cut(G: nx.DiGraph, fixed_t) -> Tuple[Cut_value, ST_partition]:
     return min_cut_value, st_partition
 
 
-def global_min_cut(G: nx.DiGraph) -> Tuple[Cut_value, ST_partition]:
+def global_min_cut(G: nx.DiGraph | FlowNetwork, brute_force=False, stats: Stats | None = None, budget: Budget | None = None) -> Tuple[Cut_value, ST_partition]:
     """
     Given a graph G, return the global min cut of the graph.
     """
@@ -98,8 +498,8 @@ def global_min_cut(G: nx.DiGraph) -> Tuple[Cut_value, ST_partition]:
     if len(nodes) == 1:
         return (math.inf, (set(nodes), set()))
     fixed_node = nodes[0]
-    min_s_cut_value, min_s_cut_partition = minimum_s_cut(G, fixed_node)
-    min_t_cut_value, min_t_cut_partition = minimum_t_cut(G, fixed_node)
+    min_s_cut_value, min_s_cut_partition = minimum_s_cut(G, fixed_node, brute_force, stats, budget)
+    min_t_cut_value, min_t_cut_partition = minimum_t_cut(G, fixed_node, brute_force, stats, budget)
 
     if min_s_cut_value <= min_t_cut_value:
         return min_s_cut_value, min_s_cut_partition
@@ -107,11 +507,15 @@ def global_min_cut(G: nx.DiGraph) -> Tuple[Cut_value, ST_partition]:
         return min_t_cut_value, min_t_cut_partition
         
 
-def partly_specified_min_cut(G: nx.DiGraph, child_vector: str) -> Tuple[Cut_value, ST_partition]:
+def partly_specified_min_cut(G: nx.DiGraph, child_vector: str | Vector, brute_force=False, network: FlowNetwork | None = None, stats: Stats | None = None) -> Tuple[Cut_value, ST_partition]:
     """
     Given a collapsed graph G (at least one node is specified as S or T because of the 'collapse_graph()' method), 
     return the min cut of the collapsed graph with the specified cut.
+    The flow network of G can be passed as network, so it is not rebuilt for every child.
     """
+    if not brute_force:
+        return partly_specified_network_min_cut(FlowNetwork.prepare(G) if network is None else network, child_vector, stats=stats)
+
     # Collapse the graph based on the child vector
     collapsed_graph = collapse_graph(G, child_vector)
     nodes = list(collapsed_graph.nodes)
@@ -126,9 +530,60 @@ def partly_specified_min_cut(G: nx.DiGraph, child_vector: str) -> Tuple[Cut_valu
     if 'S' in nodes and 'T' in nodes:
         return minimum_cut(collapsed_graph, 'S', 'T', flow_func=edmonds_karp)
     if 'S' in nodes:
-        return minimum_s_cut(collapsed_graph, 'S')
+        return minimum_s_cut(collapsed_graph, 'S', brute_force)
     if 'T' in nodes:
-        return minimum_t_cut(collapsed_graph, 'T')
+        return minimum_t_cut(collapsed_graph, 'T', brute_force)
+
+
+def partly_specified_network_min_cut(N: FlowNetwork, child_vector: str | Vector, stats: Stats | None = None, budget: Budget | None = None) -> Tuple[Cut_value, ST_partition]:
+    """
+    Given the flow network N of a graph and a child vector, return the min cut of the collapsed network. Operation counts
+    and the 'collapse' and 'max_flow' phases are added to stats if given. The flow engines stop at the deadline of budget.
+    """
+    child_vector = vector_to_mask(child_vector) if isinstance(child_vector, str) else child_vector
+
+    # Collapse the network based on the child vector
+    with phase(stats, 'collapse'):
+        collapsed_network = collapse_network(N, child_vector)
+    if stats is not None:
+        stats.add('contractions')
+    nodes = collapsed_network.index
+
+    if 'S' not in nodes and 'T' not in nodes:
+        raise ValueError('No node is specified as S or T. Graphs must be collapsed before using this function.')
+
+    # Temporary fix for the case where the graph has only 1 node
+    if len(nodes) == 1:
+        return (math.inf, (set(nodes), set()))
+
+    with phase(stats, 'max_flow'):
+        if 'S' in nodes and 'T' in nodes:
+            return pr.push_relabel_network(collapsed_network, 'S', 'T', stats, budget=budget)
+        if 'S' in nodes:
+            return minimum_s_cut(collapsed_network, 'S', stats=stats, budget=budget)
+        if 'T' in nodes:
+            return minimum_t_cut(collapsed_network, 'T', stats=stats, budget=budget)
+
+
+def collapse_network(N: FlowNetwork, mother: str | Vector) -> FlowNetwork:
+    """
+    Given a flow network N and a mother node, represented by its binary vector, return the collapsed flow network.
+    The specified nodes are merged into 'S' and 'T' in a single pass over the arcs, summing parallel capacities.
+    """
+    mask, length = vector_to_mask(mother) if isinstance(mother, str) else mother
+
+    # The specified nodes are the first nodes of the order, the remaining nodes keep their order and are followed by 'S' and 'T'
+    labels = N.labels[length:]
+    S_id = T_id = len(labels)
+    if mask != (1 << length) - 1:
+        labels.append('S')
+        T_id += 1
+    if mask != 0:
+        labels.append('T')
+
+    node_map = [T_id if mask >> i & 1 else S_id for i in range(length)] + list(range(N.n - length))
+
+    return N.contract(node_map, labels)
 
 
 def contract_nodes_with_edge_addition(G: nx.DiGraph, u: int | str, v: int | str, self_loops=True, copy=True) -> nx.DiGraph:
@@ -151,7 +606,23 @@ def contract_nodes_with_edge_addition(G: nx.DiGraph, u: int | str, v: int | str,
     return G_collapsed
 
 
-def collapse_graph(G: nx.DiGraph, mother: str) -> nx.DiGraph:
+def specified_nodes(G: nx.DiGraph, mother: str | Vector) -> Tuple[list, list]:
+    """
+    Given a graph G and a mother node, represented by its binary vector, return the nodes specified as S and as T.
+    """
+    mask, length = vector_to_mask(mother) if isinstance(mother, str) else mother
+    S = []
+    T = []
+    for i, node in zip(range(length), G.nodes):
+        if mask >> i & 1:
+            T.append(node)
+        else:
+            S.append(node)
+
+    return S, T
+
+
+def collapse_graph(G: nx.DiGraph, mother: str | Vector) -> nx.DiGraph:
     """
     Given a directed graph G and a mother node, represented by its binary vector, return the collapsed graph.
     """
@@ -159,30 +630,28 @@ def collapse_graph(G: nx.DiGraph, mother: str) -> nx.DiGraph:
         raise ValueError('The graph must be directed to use this function.')
 
     # Separate the nodes into sets S and T
-    nodes = list(G.nodes)
-    S = []
-    T = []
-    for i in range(len(mother)):
-        if mother[i] == '0':
-            S.append(nodes[i])
-        elif mother[i] == '1':
-            T.append(nodes[i])
+    S, T = specified_nodes(G, mother)
+    side = dict.fromkeys(S, 'S') | dict.fromkeys(T, 'T')
 
-    # Collapse the nodes in S and T
-    G_collapsed = G.copy()
+    # Build the collapsed graph in a single pass over the edges, adding up the capacities of parallel edges
+    G_collapsed = nx.DiGraph()
+    G_collapsed.add_nodes_from((node, data) for node, data in G.nodes(data=True) if node not in side)
     if len(S) > 0:
         G_collapsed.add_node('S')
-        for node in S:
-            G_collapsed = contract_nodes_with_edge_addition(G_collapsed, 'S', node, self_loops=False)
     if len(T) > 0:
         G_collapsed.add_node('T')
-        for node in T:
-            G_collapsed = contract_nodes_with_edge_addition(G_collapsed, 'T', node, self_loops=False)
-        
+
+    capacities = {}
+    for u, v, capacity in G.edges(data='capacity', default=math.inf):
+        u, v = side.get(u, u), side.get(v, v)
+        if u != v:
+            capacities[u, v] = capacities.get((u, v), 0) + capacity
+    G_collapsed.add_edges_from((u, v, {'capacity': capacity}) for (u, v), capacity in capacities.items())
+
     return G_collapsed
 
 
-def get_original_partition(G: nx.DiGraph, partition: ST_partition, mother: str) -> ST_partition:
+def get_original_partition(G: nx.DiGraph, partition: ST_partition, mother: str | Vector) -> ST_partition:
     """
     Given a graph G, a partition with collapsed nodes 'S' and 'T' and mother vector that was used to collapse the graph, return the partition with the original nodes.
     """
@@ -190,14 +659,7 @@ def get_original_partition(G: nx.DiGraph, partition: ST_partition, mother: str)
     original_partition = partition
 
     # Separate the nodes into sets S and T
-    nodes = list(G.nodes)
-    S = []
-    T = []
-    for i in range(len(mother)):
-        if mother[i] == '0':
-            S.append(nodes[i])
-        elif mother[i] == '1':
-            T.append(nodes[i])
+    S, T = specified_nodes(G, mother)
 
     # Remove the S and T nodes from the partition and replace them with the original nodes
     for side in original_partition:
@@ -211,106 +673,295 @@ def get_original_partition(G: nx.DiGraph, partition: ST_partition, mother: str)
     return original_partition
 
 
-def varizani_yannakakis_directed(G: nx.DiGraph) -> list[Cut]:
+def expand_child(G: nx.DiGraph, network: FlowNetwork, child_vector: Vector, labels: CutLabels, brute_force=False, stats: Stats | None = None, budget: Budget | None = None) -> Cut:
     """
-    Varizani-Yannakakis algorithm for enumerating all min-cuts of a graph G.
+    Given a graph G, its flow network and the vector of a child in the VY tree, return the min cut of the child as Cut
+    over the shared labels of G.
     """
-    enumerated_cuts = []
+    # Calculate the min cut for the child and get the necessary data
+    if brute_force:
+        child_min_value, child_min_partition = partly_specified_min_cut(G, child_vector, brute_force)
+    else:
+        child_min_value, child_min_partition = partly_specified_network_min_cut(network, child_vector, stats, budget)
+    with phase(stats, 'vector_conversion'):
+        child_min_partition = get_original_partition(G, child_min_partition, child_vector)
+        child_min_mask = cut_to_mask(G, child_min_partition)[0]
 
-    # Calculate the global min cut of the graph and get necessary data
-    min_cut_value, min_cut_partition = global_min_cut(G)
-    min_cut_vector = cut_to_vector(G, min_cut_partition)
-    mother = '0' if min_cut_vector[0] == '0' else '1'
+    return Cut(child_min_value, child_min_mask, child_vector, labels)
 
-    
-    # Initialize priority queue with the min cut value, it's node partition, the mother vector and all possible leaf vectors
-    queue = PriorityQueue()
-    queue.put(Cut(min_cut_value, {'st_partition': min_cut_partition, 'partition_vector': min_cut_vector, 'mother': mother}))
 
-    while not queue.empty():
+# State of a child worker process: the graph and its flow network are sent once when the worker starts
+_worker_state = {}
 
-        # Get the current cut with the smallest value
-        current_cut: Cut = queue.get()
 
-        # Add the current cut to the list of enumerated cuts
-        enumerated_cuts.append(current_cut)
-        # print(current_cut.value, current_cut.partition_vector)
+def _init_child_worker(G: nx.DiGraph):
+    _worker_state['graph'] = G
+    _worker_state['network'] = as_network(G)
+    _worker_state['labels'] = CutLabels(G)
 
-        # Get the immediate children of the current cut
-        immediate_children = get_immediate_children(current_cut.mother, current_cut.partition_vector)
 
-        for child_vector in immediate_children:
-            # Calculate the min cut for the child and get the necessary data
-            child_min_value, child_min_partition = partly_specified_min_cut(G, child_vector)
-            child_min_partition = get_original_partition(G, child_min_partition, child_vector)
-            child_min_vector = cut_to_vector(G, child_min_partition)
+def _expand_child_in_worker(job: Tuple[Vector, bool, bool, Budget | None]) -> Tuple[Cut, dict | None]:
+    child_vector, brute_force, instrument, budget = job
+
+    stats = Stats() if instrument else None
+    cut = expand_child(_worker_state['graph'], _worker_state['network'], child_vector, _worker_state['labels'], brute_force, stats, budget)
+
+    return cut, stats.as_dict() if instrument else None
 
-            # Add the min cut of the child to the queue
-            queue.put(Cut(child_min_value, {'st_partition': child_min_partition, 'partition_vector': child_min_vector, 'mother': child_vector}))
 
-    # Return the list of enumerated cuts
-    return enumerated_cuts
+def _expand_child_in_thread(G: nx.DiGraph, network: FlowNetwork, labels: CutLabels, child_vector: Vector, brute_force: bool, instrument: bool, budget: Budget | None) -> Tuple[Cut, dict | None]:
+    # The shared graph and networks are only read, every child gets its own collapsed network and counters
+    stats = Stats() if instrument else None
+    cut = expand_child(G, network, child_vector, labels, brute_force, stats, budget)
 
+    return cut, stats.as_dict() if instrument else None
 
-def greedy_varizani_yannakakis_directed(G: nx.DiGraph) -> list[Cut]:
+
+def iter_cuts_directed(G: nx.DiGraph | FlowNetwork, max_cuts: int | None = None, max_value: Cut_value | None = None, brute_force=False, stats: Stats | None = None, workers: int | None = None, pool: str = 'process', lazy=False, memory_limit: int | None = None, spill_dir: str | None = None, checkpoint: str | None = None, checkpoint_cuts: int | None = None, checkpoint_seconds: float | None = 60.0, resume_from: str | None = None, budget: Budget | None = None, progress: Callable[[dict], None] | None = None) -> Iterator[Cut]:
+    """
+    Varizani-Yannakakis algorithm as generator, yielding the cuts of a graph G in nondecreasing order of their value.
+    The children of a cut are only computed once the caller asks for the next cut. Enumeration stops after max_cuts cuts
+    or before the first cut with a value greater than max_value. With brute_force the min cuts are computed by the
+    Edmonds-Karp sweep instead of Hao-Orlin. Operation counts, the queue size and the time of the phases 'global_min_cut', 'collapse',
+    'max_flow', 'vector_conversion' and 'queue' are recorded in stats if given (the counts of workers are merged into it).
+    With workers > 1 the children of a cut are solved in parallel, in a process pool or with pool='thread' in a thread pool
+    that shares G without pickling it (only faster on free-threaded Python builds); the output is the same as in the
+    serial case.
+    With lazy the children of a cut are queued with the value of the cut as lower bound and their min cut is only computed
+    when they reach the head of the queue, which saves most max-flow calls when only the first cuts are needed. Cuts of
+    equal value may then come in a different order. Lazy evaluation solves one child at a time and cannot use workers.
+    Queued children that cannot be among the first max_cuts cuts or exceed max_value are discarded. With memory_limit at
+    most that many queue entries are kept in memory and the rest is spilled to sorted run files in spill_dir (see CutQueue).
+    With checkpoint the state of the enumeration is saved to that file every checkpoint_cuts emitted cuts or every
+    checkpoint_seconds seconds, whichever comes first (see save_checkpoint). A run started with resume_from and the same
+    graph and options continues after the last cut emitted before the checkpoint, in exactly the order of the original run.
+    With budget the enumeration and its flow engines raise budget.Cancelled once the deadline has passed or the token has
+    been cancelled (the Edmonds-Karp sweep of brute_force is only stopped between cuts); the cuts yielded before are the
+    smallest cuts in order. progress is called after every cut with the number of cuts emitted, the queue size and the
+    value of the cut.
+    Unless brute_force is set, G may also be a FlowNetwork, which avoids building a NetworkX graph at all.
+    """
+    if lazy and workers is not None and workers > 1:
+        raise ValueError('Lazy evaluation cannot be combined with workers')
+    if max_cuts is not None and max_cuts <= 0:
+        return
+    emitted_cuts = 0
+
+    # The flow network and the node labels are built once and shared by the global min cut and all children
+    network = as_network(G)
+    labels = CutLabels(G)
+    queue = CutQueue(labels, max_cuts, max_value, memory_limit, spill_dir, stats)
+    options = (lazy, brute_force, math.nan if max_cuts is None else max_cuts, math.nan if max_value is None else max_value)
+
+    if resume_from is not None:
+        emitted_cuts = load_checkpoint(resume_from, network, labels, queue, options)
+    else:
+        # Calculate the global min cut of the graph and get necessary data
+        with phase(stats, 'global_min_cut'):
+            min_cut_value, min_cut_partition = global_min_cut(G if brute_force else network, brute_force, stats, budget)
+            min_cut_vector = cut_to_mask(G, min_cut_partition)
+        mother = (min_cut_vector[0] & 1, 1)
+
+        # Initialize priority queue with the min cut value, it's node partition, the mother vector and all possible leaf vectors
+        queue.push(Cut(min_cut_value, min_cut_vector[0], mother, labels))
+    last_checkpoint = (emitted_cuts, time.monotonic())
+
+    if workers is None or workers <= 1:
+        executor = None
+    elif pool == 'thread':
+        executor = ThreadPoolExecutor(workers)
+    else:
+        executor = ProcessPoolExecutor(workers, initializer=_init_child_worker, initargs=(G,))
+    try:
+        while len(queue) > 0:
+            if budget is not None:
+                budget.check()
+
+            # Save the state between two cuts, when all children of the cuts emitted so far are queued
+            if checkpoint is not None and (checkpoint_cuts is not None and emitted_cuts - last_checkpoint[0] >= checkpoint_cuts
+                                           or checkpoint_seconds is not None and time.monotonic() - last_checkpoint[1] >= checkpoint_seconds):
+                with phase(stats, 'checkpoint'):
+                    save_checkpoint(checkpoint, network, queue, emitted_cuts, options)
+                if stats is not None:
+                    stats.add('checkpoints')
+                last_checkpoint = (emitted_cuts, time.monotonic())
+
+            # Get the current cut with the smallest value
+            with phase(stats, 'queue'):
+                current_cut: Cut | PendingCut = queue.pop()
+            if max_value is not None and current_cut.value > max_value:
+                return
+
+            # Compute the min cut of a lazy child and queue it again with its exact value
+            if isinstance(current_cut, PendingCut):
+                child = expand_child(G, network, current_cut.mother, labels, brute_force, stats, budget)
+                with phase(stats, 'queue'):
+                    queue.push(child)
+                continue
+
+            if stats is not None:
+                stats.add('cuts')
+            yield current_cut
+            emitted_cuts += 1
+            if progress is not None:
+                progress({'cuts': emitted_cuts, 'queue_size': len(queue), 'value': current_cut.value})
+            if max_cuts is not None and emitted_cuts >= max_cuts:
+                return
+
+            # Get the immediate children of the current cut
+            immediate_children = get_immediate_children(current_cut.mother, current_cut.partition)
+
+            if lazy:
+                children = [PendingCut(current_cut.value, child_vector) for child_vector in immediate_children]
+            elif executor is None:
+                children = [expand_child(G, network, child_vector, labels, brute_force, stats, budget) for child_vector in immediate_children]
+            elif pool == 'thread':
+                # Solve the children in threads that share the graph and the network
+                children = []
+                for child, child_stats in executor.map(lambda child_vector: _expand_child_in_thread(G, network, labels, child_vector, brute_force, stats is not None, budget), immediate_children):
+                    children.append(child)
+                    if child_stats is not None:
+                        stats.merge(child_stats)
+            else:
+                # Solve the children in the worker processes, one chunk of siblings per worker to save round trips.
+                # The token cannot be sent to the workers, it is checked here between the cuts
+                worker_budget = budget.without_token() if budget is not None else None
+                jobs = [(child_vector, brute_force, stats is not None, worker_budget) for child_vector in immediate_children]
+                children = []
+                for child, child_stats in executor.map(_expand_child_in_worker, jobs, chunksize=max(1, -(-len(jobs) // workers))):
+                    child.labels = labels
+                    children.append(child)
+                    if child_stats is not None:
+                        stats.merge(child_stats)
+
+            # Add the min cuts of the children to the queue
+            with phase(stats, 'queue'):
+                for child in children:
+                    queue.push(child)
+            if stats is not None:
+                stats.maximum('queue_size', len(queue))
+    finally:
+        queue.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def varizani_yannakakis_directed(G: nx.DiGraph, stats: Stats | None = None, **options) -> list[Cut]:
+    """
+    Varizani-Yannakakis algorithm for enumerating all min-cuts of a graph G. The options are those of iter_cuts_directed.
+    """
+    cuts = list(iter_cuts_directed(G, stats=stats, **options))
+    if stats is not None:
+        stats.emit()
+
+    return cuts
+
+
+def anytime_varizani_yannakakis(G: nx.DiGraph | nx.Graph | FlowNetwork, deadline: float | None = None, time_budget: float | None = None, token: CancelToken | None = None, stats: Stats | None = None, **options) -> Tuple[list[Cut], bool]:
+    """
+    Varizani-Yannakakis enumeration under a latency budget. It stops at the deadline (a time.monotonic() timestamp),
+    after time_budget seconds or once token is cancelled, also within the flow engines, and returns the cuts found so
+    far, which are the smallest cuts of G in order, together with whether the enumeration is complete (it was not
+    stopped before max_cuts, max_value or the last cut). The conversion of G into a flow network counts against the
+    budget but is not interrupted. The other options, e.g. max_cuts and progress, are those of iter_cuts_directed.
+    """
+    budget = Budget.create(deadline, time_budget, token)
+    G = G if G.is_directed() else G.to_directed()
+    cuts = []
+    try:
+        for cut in iter_cuts_directed(G, stats=stats, budget=budget, **options):
+            cuts.append(cut)
+        complete = True
+    except Cancelled:
+        complete = False
+    if stats is not None:
+        stats.emit()
+
+    return cuts, complete
+
+
+def greedy_varizani_yannakakis_directed(G: nx.DiGraph, brute_force=False, stats: Stats | None = None) -> list[Cut]:
     """
     Combination of the Varizani-Yannakakis algorithm and the greedy algorithm for computing a cut basis of the graph G.
+    The basis has n - c cuts for a graph with c weakly connected components, so it is empty for a graph without edges.
+    Besides the counts and phases of iter_cuts_directed, stats records the 'dependency_check' phase and its count.
     """
     cut_basis = []
-    edge_vectors = []
+    basis = fg.GF2Basis()
+    space = cb.CutSpace(G)
+    network = FlowNetwork.prepare(G)
+    labels = CutLabels(G)
+    rank = G.number_of_nodes() - nx.number_weakly_connected_components(G)
 
     # Calculate the global min cut of the graph and get necessary data
-    min_cut_value, min_cut_partition = global_min_cut(G)
-    min_cut_vector = cut_to_vector(G, min_cut_partition)
-    mother = '0' if min_cut_vector[0] == '0' else '1'
+    with phase(stats, 'global_min_cut'):
+        min_cut_value, min_cut_partition = global_min_cut(G if brute_force else network, brute_force, stats)
+        min_cut_vector = cut_to_mask(G, min_cut_partition)
+    mother = (min_cut_vector[0] & 1, 1)
     
     # Initialize priority queue with the min cut value, it's node partition, the mother vector and all possible leaf vectors
-    queue = PriorityQueue()
-    queue.put(Cut(min_cut_value, {'st_partition': min_cut_partition, 'partition_vector': min_cut_vector, 'mother': mother}))
+    queue = CutQueue(labels)
+    queue.push(Cut(min_cut_value, min_cut_vector[0], mother, labels))
 
-    while not queue.empty():
+    while len(queue) > 0:
 
         # Get the current cut with the smallest value
-        current_cut: Cut = queue.get()
-
-        # Check the curerent cut for dependency
-        current_edge_partition = cb.cut_partition_to_edge_partition(G, current_cut.st_partition)
-        current_edge_vector = cb.edge_partition_to_vector(G, current_edge_partition)
-        edge_vectors.append(current_edge_vector)
-        cut_basis.append(current_cut)
-        matrix = cb.edge_vectors_to_matrix(edge_vectors)
-        for line in matrix:
-            print(line)
-        print()
-        if fg.has_dependent_rows(matrix):
-            edge_vectors.pop()
-            cut_basis.pop()
+        with phase(stats, 'queue'):
+            current_cut: Cut = queue.pop()
+
+        # Add the current cut to the basis if its edge vector is independent of the edge vectors of the basis
+        with phase(stats, 'dependency_check'):
+            independent = basis.insert(space.edge_mask(current_cut.partition[0]))
+        if stats is not None:
+            stats.add('cuts')
+            stats.add('dependency_checks')
+        if independent:
+            cut_basis.append(current_cut)
 
         # If the cut basis is complete, return it
-        if len(cut_basis) == G.number_of_nodes() - 1:
-            return cut_basis
+        if len(cut_basis) == rank:
+            break
 
         # Get the immediate children of the current cut
-        immediate_children = get_immediate_children(current_cut.mother, current_cut.partition_vector)
+        immediate_children = get_immediate_children(current_cut.mother, current_cut.partition)
 
         for child_vector in immediate_children:
             # Calculate the min cut for the child and get the necessary data
-            child_min_value, child_min_partition = partly_specified_min_cut(G, child_vector)
-            child_min_partition = get_original_partition(G, child_min_partition, child_vector)
-            child_min_vector = cut_to_vector(G, child_min_partition)
+            child_min_value, child_min_partition = partly_specified_min_cut(G, child_vector, brute_force, network, stats)
+            with phase(stats, 'vector_conversion'):
+                child_min_partition = get_original_partition(G, child_min_partition, child_vector)
+                child_min_mask = cut_to_mask(G, child_min_partition)[0]
 
             # Add the min cut of the child to the queue
-            queue.put(Cut(child_min_value, {'st_partition': child_min_partition, 'partition_vector': child_min_vector, 'mother': child_vector}))
+            with phase(stats, 'queue'):
+                queue.push(Cut(child_min_value, child_min_mask, child_vector, labels))
+        if stats is not None:
+            stats.maximum('queue_size', len(queue))
+
+    if stats is not None:
+        stats.emit()
+    return cut_basis
+
+
+def iter_cuts(G: nx.DiGraph | nx.Graph | FlowNetwork, **options) -> Iterator[Cut]:
+    """
+    Wrapper function for the lazy Varizani-Yannakakis enumeration that works with directed and undirected graphs.
+    The options are those of iter_cuts_directed.
+    """
+    G = G if G.is_directed() else G.to_directed()
+    return iter_cuts_directed(G, **options)
 
 
-def varizani_yannakakis(G: nx.DiGraph | nx.Graph, greedy=False) -> list[Cut]:
+def varizani_yannakakis(G: nx.DiGraph | nx.Graph, greedy=False, **options) -> list[Cut]:
     """
     Wrapper function for the Varizani-Yannakakis algorithm that works with directed and undirected graphs.
+    The options are those of iter_cuts_directed, or only brute_force and stats for the greedy cut basis.
     """
+    G = G if G.is_directed() else G.to_directed()
     if greedy == False:
-        return varizani_yannakakis_directed(G) if G.is_directed() else varizani_yannakakis_directed(G.to_directed())
+        return varizani_yannakakis_directed(G, **options)
     else:
-        return greedy_varizani_yannakakis_directed(G) if G.is_directed() else greedy_varizani_yannakakis_directed(G.to_directed())
+        return greedy_varizani_yannakakis_directed(G, **options)
 
 
 if __name__ == '__main__':
@@ -1,5 +1,25 @@
 import pytest
 import networkx as nx
+import os
+from src.batch import load_molecule
+
+
+MOLECULES = os.path.join(os.path.dirname(__file__), '..', 'data', 'example_molecules')
+
+
+@pytest.fixture()
+def molecule_path():
+    """
+    Returns the path of an example molecule given its file name, e.g. molecule_path('0.graphml').
+    """
+    return lambda name: os.path.join(MOLECULES, name)
+
+@pytest.fixture()
+def example_molecule(molecule_path):
+    """
+    Example molecule 0 with the bond orders as capacities.
+    """
+    return load_molecule(molecule_path('0.graphml'))
 
 
 @pytest.fixture()
@@ -49,6 +69,7 @@ def disconnected_graph():
     G = nx.Graph()
     G.add_edge(1, 2, capacity=1)
     G.add_edge(3, 4, capacity=2)
+    return G
 
 @pytest.fixture()
 def unreachable_graph():
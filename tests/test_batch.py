@@ -0,0 +1,118 @@
+import networkx as nx
+import io
+import json
+import shutil
+import pytest
+from src.batch import READERS, find_molecules, load_molecule, solve_molecule, process_molecule, iter_results, run_batch
+from src.corpus import pack_corpus
+from src.varizani_yannakakis import varizani_yannakakis, global_min_cut
+
+
+@pytest.fixture()
+def molecule_dir(tmp_path, molecule_path):
+    for name in ['0.graphml', '1.graphml', '2.graphml']:
+        shutil.copy(molecule_path(name), tmp_path)
+    return tmp_path
+
+
+def test_find_molecules(molecule_dir):
+    assert len(find_molecules([str(molecule_dir)])) == 3
+    assert len(find_molecules([str(molecule_dir / '1*.graphml'), str(molecule_dir / '0.graphml')])) == 2
+
+
+def test_load_molecule(molecule_path):
+    G = load_molecule(molecule_path('0.graphml'))
+    assert all('capacity' in data and 'order' not in data for _, _, data in G.edges(data=True))
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'complex_graph', 'star_graph'])
+def test_solve_molecule(request, graph):
+    G = request.getfixturevalue(graph)
+    assert solve_molecule(G, 'vy', 3) == [(cut.value, cut.st_partition) for cut in varizani_yannakakis(G)[:3]]
+    assert solve_molecule(G, 'global') == [global_min_cut(G.to_directed())]
+
+
+def test_solve_molecule_disconnected(disconnected_graph):
+    assert solve_molecule(disconnected_graph, 'basis', 5) == [(cut.value, cut.st_partition) for cut in varizani_yannakakis(disconnected_graph, greedy=True)]
+    assert len(solve_molecule(disconnected_graph, 'basis', 1)) == 1
+
+
+def test_solve_molecule_unknown_algorithm(complex_graph):
+    with pytest.raises(ValueError):
+        solve_molecule(complex_graph, 'unknown')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_iter_results(molecule_dir, workers):
+    paths = find_molecules([str(molecule_dir)])
+    results = sorted(iter_results(paths, 'vy', 5, workers=workers), key=lambda result: result['file'])
+    assert [result['file'] for result in results] == paths
+    for path, result in zip(paths, results):
+        G = load_molecule(path)
+        assert [cut['value'] for cut in result['cuts']] == [cut.value for cut in varizani_yannakakis(G, max_cuts=5)]
+
+
+def test_run_batch(molecule_dir):
+    output = io.StringIO()
+    summary = run_batch(find_molecules([str(molecule_dir)]), output, 'global')
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert summary['molecules'] == len(lines) == 3
+    assert all(len(line['cuts']) == 1 for line in lines)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_batch_malformed_molecule(molecule_dir, workers):
+    (molecule_dir / 'broken.graphml').write_text('<graphml><graph edgedefault="undirected"><node id="a">')
+    output = io.StringIO()
+    summary = run_batch(find_molecules([str(molecule_dir)]), output, 'global', workers=workers)
+    lines = {line['file']: line for line in map(json.loads, output.getvalue().splitlines())}
+    assert summary['molecules'] == len(lines) == 4
+    assert summary['errors'] == 1
+    assert 'ParseError' in lines[str(molecule_dir / 'broken.graphml')]['error']
+    assert sum('cuts' in line for line in lines.values()) == 3
+
+
+def test_run_batch_infinite_cut(tmp_path):
+    # Edges without the capacity attribute are infinite, which JSON cannot represent
+    nx.write_graphml(nx.Graph([('a', 'b')]), tmp_path / 'infinite.graphml')
+    output = io.StringIO()
+    run_batch([str(tmp_path / 'infinite.graphml')], output, 'global')
+    line = output.getvalue()
+    assert 'Infinity' not in line
+    assert json.loads(line)['cuts'][0]['value'] is None
+
+
+@pytest.mark.parametrize('algorithm', ['vy', 'global'])
+def test_stream_reader(molecule_dir, algorithm):
+    # Edges without the capacity attribute are infinite for both readers
+    G = nx.read_graphml(molecule_dir / '0.graphml')
+    for u, v, data in list(G.edges(data=True))[::3]:
+        del data['order']
+    nx.write_graphml(G, molecule_dir / '3.graphml')
+
+    paths = find_molecules([str(molecule_dir)])
+    streamed = list(iter_results(paths, algorithm, 5, reader='stream'))
+    parsed = list(iter_results(paths, algorithm, 5))
+    assert [result['cuts'] for result in streamed] == [result['cuts'] for result in parsed]
+    assert [result['edges'] for result in streamed] == [result['edges'] for result in parsed]
+    assert all(result['error'].startswith('ValueError') for result in iter_results(paths, 'basis', reader='stream'))
+
+
+def test_edge_count_directed(tmp_path):
+    G = nx.DiGraph()
+    G.add_edge('a', 'b', order=1)
+    G.add_edge('b', 'a', order=2)
+    G.add_edge('b', 'c', order=1)
+    nx.write_graphml(G, tmp_path / 'directed.graphml')
+    pack_corpus([str(tmp_path / 'directed.graphml')], str(tmp_path / 'molecules.corpus'))
+
+    for path in [str(tmp_path / 'directed.graphml'), str(tmp_path / 'molecules.corpus') + '#0']:
+        for reader in READERS:
+            assert process_molecule(path, 'global', reader=reader)['edges'] == 3
+
+
+def test_thread_pool(molecule_dir):
+    paths = find_molecules([str(molecule_dir)])
+    threaded = sorted(iter_results(paths, 'vy', 5, workers=2, pool='thread'), key=lambda result: result['file'])
+    serial = list(iter_results(paths, 'vy', 5))
+    assert [result['cuts'] for result in threaded] == [result['cuts'] for result in serial]
@@ -0,0 +1,63 @@
+import networkx as nx
+import json
+import pytest
+from src.benchmark import ENGINES, run_benchmark, summarize, compare_reports, main
+from src.varizani_yannakakis import varizani_yannakakis
+
+
+@pytest.fixture()
+def paths(molecule_path):
+    return [molecule_path(name) for name in ['2.graphml', '4.graphml']]
+
+
+@pytest.mark.parametrize('task', list(ENGINES))
+def test_run_benchmark(paths, task):
+    report = run_benchmark(paths, [task], enumeration_cuts=10)
+    assert report['meta']['molecules'] == 2
+    results = report['tasks'][task]
+    assert list(results) == list(ENGINES[task])
+    for result in results.values():
+        assert result['molecules'] + result['errors'] == 2
+        assert result['p10'] <= result['median'] <= result['p90'] <= result['max']
+
+
+def test_run_benchmark_engine_selection(paths):
+    report = run_benchmark(paths, ['one_side_fixed_min_cut', 'global_min_cut'], ['hao_orlin'], per_molecule=True)
+    for results in report['tasks'].values():
+        # The reference engine always runs
+        assert len(results) == 2
+        assert results['hao_orlin']['mismatches'] == 0
+        assert [record['file'] for record in results['hao_orlin']['per_molecule']] == paths
+
+
+def test_enumeration_cuts_option(tmp_path, complex_graph):
+    nx.set_edge_attributes(complex_graph, nx.get_edge_attributes(complex_graph, 'capacity'), 'order')
+    nx.write_graphml(complex_graph, tmp_path / 'complex.graphml')
+    output = tmp_path / 'report.json'
+
+    # 0 enumerates all cuts
+    main([str(tmp_path / 'complex.graphml'), '--task', 'enumeration', '--enumeration-cuts', '0', '--per-molecule', '--output', str(output)])
+    report = json.loads(output.read_text())
+    assert report['meta']['enumeration_cuts'] is None
+    for result in report['tasks']['enumeration'].values():
+        assert result['mismatches'] == result['errors'] == 0
+        assert result['per_molecule'][0]['value'] == [cut.value for cut in varizani_yannakakis(complex_graph)]
+
+    main([str(tmp_path / 'complex.graphml'), '--task', 'enumeration', '-k', '3', '--per-molecule', '--output', str(output)])
+    report = json.loads(output.read_text())
+    assert report['meta']['enumeration_cuts'] == 3
+    assert len(report['tasks']['enumeration']['hao_orlin']['per_molecule'][0]['value']) == 3
+
+
+def test_summarize():
+    summary = summarize([1.0, 2.0, 4.0], [10, 20, 40], [10, 20, 40])
+    assert summary['median'] == 2.0
+    assert summary['total'] == 7.0
+    assert summary['nodes_exponent'] == pytest.approx(1.0)
+    assert summarize([], [], []) == {'molecules': 0}
+
+
+def test_compare_reports():
+    baseline = {'tasks': {'max_flow': {'push_relabel': {'median': 2.0}}}}
+    report = {'tasks': {'max_flow': {'push_relabel': {'median': 1.0}, 'edmonds_karp': {'median': 1.0}}}}
+    assert compare_reports(baseline, report) == {'max_flow': {'push_relabel': 0.5}}
@@ -0,0 +1,51 @@
+import time
+import pytest
+import src.push_relabel as pr
+import src.hao_orlin_original as ho
+from src.budget import Budget, CancelToken, Cancelled
+from src.varizani_yannakakis import anytime_varizani_yannakakis, varizani_yannakakis
+
+
+def test_budget():
+    assert Budget.create() is None
+    assert not Budget.create(time_budget=60).expired()
+    assert Budget.create(deadline=time.monotonic() + 60, time_budget=0).expired()
+    token = CancelToken()
+    budget = Budget.create(token=token)
+    budget.check()
+    token.cancel()
+    with pytest.raises(Cancelled):
+        budget.check()
+    assert not budget.without_token().expired()
+
+
+@pytest.mark.parametrize('engine', [lambda G, budget: pr.push_relabel(G, 'a', 'f', budget=budget), lambda G, budget: ho.hao_orlin(G, 'a', budget=budget)])
+def test_engines_stop_at_deadline(networkx_example_weighted_graph, engine):
+    assert engine(networkx_example_weighted_graph, Budget(time.monotonic() + 60)) == engine(networkx_example_weighted_graph, None)
+    with pytest.raises(Cancelled):
+        engine(networkx_example_weighted_graph, Budget(time.monotonic()))
+
+
+@pytest.mark.parametrize('options', [{}, {'lazy': True}, {'workers': 2}, {'workers': 2, 'pool': 'thread'}])
+def test_anytime_cancel(example_molecule, options):
+    G = example_molecule
+    token = CancelToken()
+    reports = []
+
+    def progress(report):
+        reports.append(report)
+        if report['cuts'] == 5:
+            token.cancel()
+
+    cuts, complete = anytime_varizani_yannakakis(G, token=token, progress=progress, **options)
+    assert not complete
+    assert [(cut.value, cut.partition) for cut in cuts] == [(cut.value, cut.partition) for cut in varizani_yannakakis(G, max_cuts=5, **options)]
+    assert [report['cuts'] for report in reports] == [1, 2, 3, 4, 5]
+    assert [report['value'] for report in reports] == [cut.value for cut in cuts]
+
+
+def test_anytime_deadline(complex_graph):
+    assert anytime_varizani_yannakakis(complex_graph, time_budget=0) == ([], False)
+    cuts, complete = anytime_varizani_yannakakis(complex_graph, time_budget=60)
+    assert complete
+    assert [(cut.value, cut.st_partition) for cut in cuts] == [(cut.value, cut.st_partition) for cut in varizani_yannakakis(complex_graph)]
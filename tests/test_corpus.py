@@ -0,0 +1,65 @@
+import networkx as nx
+import pytest
+from src.corpus import Corpus, pack_corpus, unpack_corpus, is_corpus
+from src.flow_network import FlowNetwork
+from src.batch import find_molecules, load_molecule
+
+
+NAMES = ['0.graphml', '1.graphml', '89.graphml']
+
+
+@pytest.fixture()
+def corpus_file(tmp_path, molecule_path):
+    path = str(tmp_path / 'molecules.corpus')
+    pack_corpus([molecule_path(name) for name in NAMES], path)
+    return path
+
+
+def assert_same_graph(G, H):
+    assert G.is_directed() == H.is_directed()
+    assert list(G.nodes(data=True)) == list(H.nodes(data=True))
+    assert list(G.edges(data=True)) == list(H.edges(data=True))
+
+
+def test_corpus_graphs(corpus_file, molecule_path):
+    corpus = Corpus(corpus_file)
+    assert is_corpus(corpus_file)
+    assert len(corpus) == 3
+    assert corpus.names == NAMES
+    for name in NAMES:
+        assert_same_graph(corpus[name], nx.read_graphml(molecule_path(name)))
+
+
+def test_corpus_networks(corpus_file, molecule_path):
+    corpus = Corpus(corpus_file)
+    for k, name in enumerate(NAMES):
+        N = FlowNetwork.from_networkx(nx.read_graphml(molecule_path(name)), 'order')
+        M = corpus.network(k)
+        assert (M.labels, M.offsets, M.heads, M.reverse, M.capacity) == (N.labels, N.offsets, N.heads, N.reverse, N.capacity)
+
+
+def test_unpack_corpus(corpus_file, tmp_path, molecule_path):
+    assert unpack_corpus(corpus_file, str(tmp_path / 'unpacked')) == 3
+    for name in NAMES:
+        assert_same_graph(nx.read_graphml(str(tmp_path / 'unpacked' / name)), nx.read_graphml(molecule_path(name)))
+
+
+def test_corpus_missing_attributes(tmp_path):
+    G = nx.DiGraph()
+    G.add_node('a', charge=1, name='x')
+    G.add_node('b', name='y')
+    G.add_edge('a', 'b', order=2.0, aromatic=True)
+    G.add_edge('b', 'a', order=1.0)
+    nx.write_graphml(G, str(tmp_path / 'g.graphml'))
+
+    pack_corpus([str(tmp_path / 'g.graphml')], str(tmp_path / 'g.corpus'))
+    H = Corpus(str(tmp_path / 'g.corpus'))[0]
+    assert_same_graph(H, nx.read_graphml(str(tmp_path / 'g.graphml')))
+    assert Corpus(str(tmp_path / 'g.corpus')).network(0).capacity.tolist() == [2.0, 1.0]
+
+
+def test_batch_reads_corpus(corpus_file, molecule_path):
+    paths = find_molecules([corpus_file])
+    assert paths == [f'{corpus_file}#{k}' for k in range(3)]
+    for path, name in zip(paths, NAMES):
+        assert_same_graph(load_molecule(path), load_molecule(molecule_path(name)))
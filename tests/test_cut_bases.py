@@ -0,0 +1,38 @@
+import pytest
+from src.cut_bases import CutSpace, cut_partition_to_edge_partition, edge_partition_to_vector, canonical_greedy_cut_basis
+from src.varizani_yannakakis import varizani_yannakakis
+from src.stats import Stats
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'complex_graph', 'star_graph', 'icl_weighted_graph'])
+@pytest.mark.parametrize('directed', [False, True])
+def test_cut_space_edge_vectors(request, graph, directed):
+    G = request.getfixturevalue(graph)
+    G = G.to_directed() if directed else G
+    space = CutSpace(G)
+    cuts = varizani_yannakakis(G)
+
+    for cut, batch_vector in zip(cuts, space.edge_vectors([cut.partition[0] for cut in cuts])):
+        edge_partition = cut_partition_to_edge_partition(G, cut.st_partition)
+        edge_mask = space.edge_mask(cut.partition[0])
+        assert space.partition_mask(cut.st_partition) == edge_mask
+        assert space.edge_partition(edge_mask) == edge_partition
+        assert space.to_vector(edge_mask) == edge_partition_to_vector(G, edge_partition)
+        assert ''.join('1' if bit else '0' for bit in batch_vector) == space.to_vector(edge_mask)
+
+
+def test_cut_space_incidence(complex_graph):
+    space = CutSpace(complex_graph)
+    assert space.incidence_matrix().sum() == 2 * complex_graph.number_of_edges()
+    assert space.edge_mask(0) == 0
+    assert space.edge_mask((1 << complex_graph.number_of_nodes()) - 1) == 0
+
+
+@pytest.mark.parametrize('graph', ['complex_graph', 'icl_weighted_graph', 'disconnected_graph'])
+def test_canonical_greedy_cut_basis_stops_when_spanned(request, graph):
+    G = request.getfixturevalue(graph).to_directed()
+    stats = Stats()
+    basis = canonical_greedy_cut_basis(G, stats)
+
+    assert basis == [CutSpace(G).to_vector(CutSpace(G).partition_mask(cut.st_partition)) for cut in varizani_yannakakis(G, greedy=True)]
+    assert stats.counts['cuts'] < len(varizani_yannakakis(G))
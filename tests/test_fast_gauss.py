@@ -0,0 +1,39 @@
+import random
+import pytest
+from src.fast_gauss import has_dependent_rows, GF2Basis
+
+
+def test_basis_insert():
+    basis = GF2Basis()
+    assert basis.insert(0b0110)
+    assert basis.insert(0b0011)
+    assert not basis.insert(0b0101)
+    assert not basis.insert(0)
+    assert basis.insert(0b1000)
+    assert len(basis) == 3
+
+
+def test_basis_reduce():
+    basis = GF2Basis()
+    basis.insert(0b110)
+    basis.insert(0b011)
+    assert basis.reduce(0b101) == 0
+    assert basis.is_independent(0b001)
+    assert not basis.is_independent(0b110)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_basis_agrees_with_fast_gauss(seed):
+    rng = random.Random(seed)
+    columns = rng.randint(1, 12)
+    vectors = [''.join(rng.choice('01') for _ in range(columns)) for _ in range(rng.randint(1, 10))]
+
+    # Greedily keep every vector that is independent of the kept ones
+    kept = []
+    basis = GF2Basis()
+    for vector in vectors:
+        independent = not has_dependent_rows([[int(bit) for bit in row] for row in kept + [vector]])
+        assert basis.insert(int(vector, 2)) == independent
+        if independent:
+            kept.append(vector)
+    assert len(basis) == len(kept)
@@ -0,0 +1,49 @@
+import random
+import numpy as np
+import pytest
+from src.fast_gauss import GF2Basis, has_dependent_rows as fast_gauss_has_dependent_rows
+from src.fast_gauss_numpy import pack_rows, rank, rank_batch, independent_rows, independent_rows_batch, dependency_witness, dependency_witness_batch, has_dependent_rows
+
+
+def random_matrix(rng, rows, columns):
+    return [[int(rng.random() < 0.3) for _ in range(columns)] for _ in range(rows)]
+
+
+def test_pack_rows():
+    packed = pack_rows(['101', '010'])
+    assert packed.dtype == np.uint64
+    assert packed.tolist() == [[0b101], [0b010]]
+    assert pack_rows([[0] * 64 + [1]]).tolist() == [[0, 1]]
+
+
+def test_rank():
+    assert rank([[1, 1, 0], [0, 1, 1], [1, 0, 1]]) == 2
+    assert rank([[1, 0], [0, 1]]) == 2
+    assert rank([[0, 0, 0]]) == 0
+
+
+def test_independent_rows():
+    assert independent_rows(['110', '011', '101', '001']) == [0, 1, 3]
+
+
+def test_dependency_witness():
+    assert dependency_witness(['110', '011', '101']) == [0, 1, 2]
+    assert dependency_witness(['100', '010', '100']) == [0, 2]
+    assert dependency_witness(['100', '010']) is None
+    assert has_dependent_rows(['110', '011', '101'])
+    assert not has_dependent_rows(['100', '010'])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_batch_agrees_with_fast_gauss(seed):
+    rng = random.Random(seed)
+    mats = [random_matrix(rng, rng.randint(1, 20), rng.randint(1, 140)) for _ in range(30)]
+
+    for mat, ranked, independent, witness in zip(mats, rank_batch(mats), independent_rows_batch(mats), dependency_witness_batch(mats)):
+        basis = GF2Basis()
+        expected = [i for i, row in enumerate(mat) if basis.insert(int(''.join(map(str, row)), 2))]
+        assert independent == expected
+        assert ranked == len(expected)
+        assert (witness is not None) == fast_gauss_has_dependent_rows([row[:] for row in mat])
+        if witness is not None:
+            assert not np.bitwise_xor.reduce(np.array([mat[i] for i in witness]), axis=0).any()
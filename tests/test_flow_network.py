@@ -0,0 +1,104 @@
+import pytest
+import networkx as nx
+from math import inf
+from src.flow_network import FlowNetwork
+
+
+def test_flow_network_undirected_triangle(undirected_triangle):
+    N = FlowNetwork.from_networkx(undirected_triangle)
+
+    assert N.n == 3
+    assert N.m == 6
+    for a in range(N.m):
+        assert N.reverse[N.reverse[a]] == a
+        assert N.capacity[a] == N.capacity[N.reverse[a]]
+
+
+def test_flow_network_directed_triangle_pairs_opposite_edges(directed_triangle):
+    N = FlowNetwork.from_networkx(directed_triangle)
+
+    assert N.m == 6
+    assert sorted(N.capacity) == [1, 1, 2, 2, 3, 3]
+
+
+def test_flow_network_one_way_edge():
+    G = nx.DiGraph()
+    G.add_edge('a', 'b', capacity=4)
+    N = FlowNetwork.from_networkx(G)
+
+    a = N.offsets[N.index['a']]
+    assert N.heads[a] == N.index['b']
+    assert N.capacity[a] == 4
+    assert N.capacity[N.reverse[a]] == 0
+
+
+def test_flow_network_missing_capacity_is_infinite():
+    G = nx.Graph()
+    G.add_edge(1, 2)
+    N = FlowNetwork.from_networkx(G)
+
+    assert list(N.capacity) == [inf, inf]
+
+
+@pytest.mark.parametrize('S, value', [
+    ({1}, 6),
+    ({1, 4}, 6),
+    ({1, 2, 3}, 10),
+])
+def test_flow_network_cut_value_and_partition(complex_graph, S, value):
+    N = FlowNetwork.from_networkx(complex_graph)
+    mask = [label in S for label in N.labels]
+
+    assert N.cut_value(mask) == value
+    assert N.to_partition(mask) == (S, set(complex_graph.nodes) - S)
+
+
+def test_flow_network_contract_sums_parallel_arcs(complex_graph):
+    N = FlowNetwork.from_networkx(complex_graph)
+    # Merge nodes 1 and 3 into 'x', keep 2 and 4
+    node_map = {1: 0, 2: 1, 3: 0, 4: 2}
+    contracted = N.contract([node_map[label] for label in N.labels], ['x', 2, 4])
+
+    assert contracted.n == 3
+    assert contracted.m == 6
+    assert contracted.cut_value([1, 0, 0]) == 1 + 5 + 4 + 2
+    assert contracted.cut_value([0, 1, 0]) == 1 + 4 + 3
+
+
+def test_flow_network_prepare(complex_graph):
+    N = FlowNetwork.prepare(complex_graph)
+
+    assert FlowNetwork.prepare(N) is N
+    assert N.labels == list(complex_graph.nodes)
+
+
+@pytest.mark.parametrize('graph', ['complex_graph', 'networkx_example_weighted_graph'])
+def test_flow_network_repeated_queries(request, graph):
+    G = request.getfixturevalue(graph)
+    N = FlowNetwork.prepare(G)
+    pairs = [(s, t) for s in G for t in G if s != t]
+
+    for s, t in pairs + pairs[::-1]:
+        value, (S, T) = nx.minimum_cut(G, s, t)
+        assert N.max_flow(s, t) == value
+        assert N.min_cut(s, t, sink_side=True) == (value, (S, T))
+        assert N.min_cut(s, t)[1][0] <= S
+
+    # The queries only read the network
+    assert vars(N).keys() == vars(FlowNetwork.prepare(G)).keys()
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_flow_network_min_cuts(networkx_example_weighted_graph, workers):
+    N = FlowNetwork.prepare(networkx_example_weighted_graph)
+    pairs = [(s, t) for s in 'abc' for t in 'def']
+
+    assert N.min_cuts(pairs, workers=workers) == [N.min_cut(s, t) for s, t in pairs]
+    assert N.min_cuts(pairs, sink_side=True, workers=workers) == [N.min_cut(s, t, sink_side=True) for s, t in pairs]
+
+
+def test_flow_network_concurrent_queries(icl_weighted_graph):
+    N = FlowNetwork.prepare(icl_weighted_graph)
+    pairs = [(s, t) for s in icl_weighted_graph for t in icl_weighted_graph if s != t] * 5
+
+    assert N.min_cuts(pairs, workers=4, pool='thread') == [N.min_cut(s, t) for s, t in pairs]
@@ -0,0 +1,84 @@
+import re
+from math import inf
+import networkx as nx
+import pytest
+from src.graphml_reader import read_network, read_networks
+from src.flow_network import FlowNetwork
+
+
+NAMES = ['0.graphml', '1.graphml', '89.graphml']
+
+
+def assert_same_network(N, M):
+    assert (N.labels, N.offsets, N.heads, N.reverse, N.capacity) == (M.labels, M.offsets, M.heads, M.reverse, M.capacity)
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_read_network(molecule_path, name):
+    path = molecule_path(name)
+    G = nx.read_graphml(path)
+    N, attributes = read_network(path, node_attributes=['atomic_num', 'formal_charge'])
+    assert_same_network(N, FlowNetwork.from_networkx(G, 'order'))
+    assert N.number_of_edges() == FlowNetwork.from_networkx(G, 'order').number_of_edges() == G.number_of_edges()
+    assert N.fingerprint() == FlowNetwork.from_networkx(G, 'order').fingerprint() != FlowNetwork.from_networkx(G.subgraph(list(G)[1:]), 'order').fingerprint()
+    assert attributes['atomic_num'] == [G.nodes[node]['atomic_num'] for node in G]
+    assert attributes['formal_charge'] == [G.nodes[node]['formal_charge'] for node in G]
+
+
+def test_read_network_attribute_subset(molecule_path):
+    _, attributes = read_network(molecule_path(NAMES[0]), node_attributes=['formal_charge'])
+    assert list(attributes) == ['formal_charge']
+    assert read_network(molecule_path(NAMES[0]))[1] == {}
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'complex_graph', 'networkx_example_weighted_graph', 'icl_weighted_graph'])
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('key_for', ['edge', 'all'])
+def test_read_network_matches_networkx(request, tmp_path, graph, directed, key_for):
+    G = request.getfixturevalue(graph)
+    G = G.to_directed() if directed else G
+    path = tmp_path / 'graph.graphml'
+    nx.write_graphml(G, path)
+    if key_for == 'all':
+        # Declare the capacity for nodes and edges with a default, which replaces the capacity of the first edge
+        text = path.read_text()
+        key = re.search(r'<key id="(\w+)" for="edge" attr.name="capacity" attr.type="(\w+)"\s*/>', text)
+        text = text.replace(key.group(0), f'<key id="{key.group(1)}" for="all" attr.name="capacity" attr.type="{key.group(2)}"><default>7</default></key>')
+        path.write_text(re.sub(f'<data key="{key.group(1)}">[^<]*</data>', '', text, count=1))
+
+    # networkx.read_graphml does not apply defaults, they are filled in here
+    H = nx.read_graphml(path)
+    missing = [data for _, _, data in H.edges(data=True) if 'capacity' not in data]
+    assert len(missing) == (key_for == 'all')
+    for data in missing:
+        data['capacity'] = 7
+    N, attributes = read_network(str(path), 'capacity', ['capacity'])
+    assert_same_network(N, FlowNetwork.from_networkx(H))
+    assert attributes['capacity'] == [7 if key_for == 'all' else None] * G.number_of_nodes()
+
+
+def test_read_network_missing_and_parallel_edges(tmp_path):
+    path = str(tmp_path / 'graph.graphml')
+    with open(path, 'w') as file:
+        file.write('''<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <key id="d0" for="edge" attr.name="order" attr.type="double"/>
+  <graph edgedefault="undirected">
+    <node id="a"/><node id="b"/><node id="c"/>
+    <edge source="a" target="b"><data key="d0">1.5</data></edge>
+    <edge source="b" target="a"><data key="d0">2.0</data></edge>
+    <edge source="b" target="c"/>
+  </graph>
+</graphml>''')
+    N, _ = read_network(path)
+    assert N.cut_value([1, 0, 0]) == 3.5
+    assert N.cut_value([1, 1, 0]) == inf
+
+
+def test_read_networks_workers(molecule_path):
+    paths = [molecule_path(name) for name in NAMES]
+    serial = list(read_networks(paths))
+    parallel = list(read_networks(paths, workers=2))
+    assert len(serial) == len(parallel) == 3
+    for (N, _), (M, _) in zip(serial, parallel):
+        assert_same_network(N, M)
@@ -4,6 +4,9 @@ from networkx.algorithms.flow import minimum_cut
 import src.push_relabel as pr
 import src.varizani_yannakakis as vy
 import src.hao_orlin_diff as ho
+import src.hao_orlin_original as hoo
+import src.hao_orlin_mittwoch as hom
+from src.flow_network import FlowNetwork
 
 
 @pytest.mark.parametrize('s', [1, 2, 3, 4])
@@ -13,7 +16,7 @@ def test_hao_orlin_star_graph(star_graph, s):
 
     min_cut = ho.hao_orlin(G, s)[0]
 
-    bf_min_cut = vy.minimum_s_cut(G2, s)[0]
+    bf_min_cut = vy.minimum_s_cut(G2, s, brute_force=True)[0]
     assert min_cut == bf_min_cut
 
 
@@ -24,7 +27,7 @@ def test_hao_orlin_complex_graph(complex_graph, s):
 
     min_cut = ho.hao_orlin(G, s)[0]
 
-    bf_min_cut = vy.minimum_s_cut(G2, s)[0]
+    bf_min_cut = vy.minimum_s_cut(G2, s, brute_force=True)[0]
     assert min_cut == bf_min_cut
 
 
@@ -35,7 +38,7 @@ def test_hao_orlin_networkx_example_weighted_graph(networkx_example_weighted_gra
 
     min_cut = ho.hao_orlin(G, s)[0]
 
-    bf_min_cut = vy.minimum_s_cut(G2, s)[0]
+    bf_min_cut = vy.minimum_s_cut(G2, s, brute_force=True)[0]
     assert min_cut == bf_min_cut
 
 
@@ -46,7 +49,7 @@ def test_hao_orlin_undirected_triangle(undirected_triangle, s):
 
     min_cut = ho.hao_orlin(G, s)[0]
 
-    bf_min_cut = vy.minimum_s_cut(G2, s)[0]
+    bf_min_cut = vy.minimum_s_cut(G2, s, brute_force=True)[0]
     assert min_cut == bf_min_cut
 
 @pytest.mark.parametrize('s', ['A', 'B', 'C', 'D', 'E', 'F'])
@@ -56,5 +59,50 @@ def test_hao_orlin_icl_weighted_graph(icl_weighted_graph, s):
 
     min_cut = ho.hao_orlin(G, s)[0]
 
-    bf_min_cut = vy.minimum_s_cut(G2, s)[0]
-    assert min_cut == bf_min_cut
\ No newline at end of file
+    bf_min_cut = vy.minimum_s_cut(G2, s, brute_force=True)[0]
+    assert min_cut == bf_min_cut
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'single_edge_graph', 'complex_graph', 'star_graph', 'networkx_example_weighted_graph', 'icl_weighted_graph'])
+def test_hao_orlin_flow_network(request, graph):
+    G = request.getfixturevalue(graph)
+    N = FlowNetwork.from_networkx(G)
+
+    for s in G.nodes:
+        min_cut, (S, T) = hoo.hao_orlin(N, s)
+
+        assert min_cut == vy.minimum_s_cut(G.to_directed(), s, brute_force=True)[0]
+        assert s in S
+        assert N.cut_value([label in S for label in N.labels]) == min_cut
+
+
+def test_hao_orlin_flow_network_directed():
+    G = nx.DiGraph()
+    G.add_edge(1, 2, capacity=5)
+    G.add_edge(2, 3, capacity=1)
+    G.add_edge(3, 1, capacity=7)
+    G.add_edge(3, 2, capacity=2)
+
+    for s in G.nodes:
+        assert hoo.hao_orlin(G, s)[0] == vy.minimum_s_cut(G, s, brute_force=True)[0]
+
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'complex_graph', 'star_graph', 'networkx_example_weighted_graph', 'icl_weighted_graph'])
+def test_minimum_t_cut(request, graph):
+    G = request.getfixturevalue(graph).to_directed()
+
+    for t in G.nodes:
+        min_cut, (S, T) = vy.minimum_t_cut(G, t)
+
+        assert min_cut == vy.minimum_t_cut(G, t, brute_force=True)[0]
+        assert t in T and S | T == set(G.nodes)
+
+
+@pytest.mark.parametrize('engine', [hoo.hao_orlin_directed, ho.hao_orlin_directed, hom.hao_orlin_directed])
+def test_hao_orlin_directed_does_not_modify_graph(networkx_example_weighted_graph, engine):
+    G = networkx_example_weighted_graph.to_directed()
+    G2 = G.copy()
+
+    engine(G, 'a')
+
+    assert all(G.nodes[v] == G2.nodes[v] for v in G) and all(G.edges[e] == G2.edges[e] for e in G.edges)
@@ -1,9 +1,11 @@
 import pytest
 import networkx as nx
+from math import inf
 from networkx.algorithms.flow import minimum_cut
 import src.push_relabel as pr
-import src.varizani_yannakakis as vy
+import src.push_relabel_without_discharge as prwd
 import src.hao_orlin_diff as ho
+from src.flow_network import FlowNetwork
 
 @pytest.mark.parametrize('s, t', [
     (1, 2),
@@ -93,3 +95,155 @@ def test_push_relabel_networkx_example_weighted_graph(networkx_example_weighted_
 
     nx_min_cut = minimum_cut(G2, s, t)[0]
     assert min_cut == nx_min_cut
+
+
+@pytest.mark.parametrize('s, t', [
+    ('a', 'b'),
+    ('a', 'e'),
+    ('c', 'f'),
+    ('d', 'e'),
+    ('f', 'b')
+])
+def test_push_relabel_does_not_modify_graph(networkx_example_weighted_graph, s, t):
+    G = networkx_example_weighted_graph
+    G2 = G.copy()
+
+    pr.push_relabel(G, s, t)
+
+    assert nx.utils.graphs_equal(G, G2)
+
+
+@pytest.mark.parametrize('s, t', [
+    (1, 2),
+    (1, 3),
+    (2, 4),
+    (3, 1),
+    (4, 2)
+])
+def test_push_relabel_flow_network(complex_graph, s, t):
+    N = FlowNetwork.from_networkx(complex_graph)
+
+    min_cut, (S, T) = pr.push_relabel(N, s, t)
+
+    assert min_cut == minimum_cut(complex_graph, s, t)[0]
+    assert s in S and t in T
+    assert N.cut_value([label in S for label in N.labels]) == min_cut
+
+
+@pytest.mark.parametrize('gap, global_relabel_frequency', [
+    (False, None),
+    (True, None),
+    (False, 1.0),
+    (True, 0.1),
+    (True, 1.0)
+])
+@pytest.mark.parametrize('s, t', [
+    ('a', 'b'),
+    ('a', 'e'),
+    ('c', 'f'),
+    ('d', 'e'),
+    ('f', 'b')
+])
+def test_push_relabel_heuristics(networkx_example_weighted_graph, s, t, gap, global_relabel_frequency):
+    G = networkx_example_weighted_graph
+
+    min_cut, (S, T) = pr.push_relabel(G, s, t, gap=gap, global_relabel_frequency=global_relabel_frequency)
+
+    assert (min_cut, (S, T)) == pr.push_relabel(G, s, t, gap=False, global_relabel_frequency=None)
+    assert min_cut == minimum_cut(G, s, t)[0]
+
+
+def test_push_relabel_long_chain():
+    G = nx.path_graph(200)
+    nx.set_edge_attributes(G, 1, 'capacity')
+    G[100][101]['capacity'] = 0.5
+
+    min_cut, (S, T) = pr.push_relabel(G, 0, 199)
+
+    assert min_cut == 0.5
+    assert S == set(range(101))
+
+
+@pytest.mark.parametrize('strategy', pr.STRATEGIES)
+@pytest.mark.parametrize('s, t', [
+    (1, 2),
+    (1, 3),
+    (2, 4),
+    (3, 1),
+    (4, 2)
+])
+def test_push_relabel_strategies(complex_graph, s, t, strategy):
+    min_cut, (S, T) = pr.push_relabel(complex_graph, s, t, strategy=strategy)
+
+    assert min_cut == minimum_cut(complex_graph, s, t)[0]
+    assert (min_cut, (S, T)) == pr.push_relabel(complex_graph, s, t, strategy='lifo', gap=False, global_relabel_frequency=None)
+
+
+def test_push_relabel_unknown_strategy(complex_graph):
+    with pytest.raises(ValueError):
+        pr.push_relabel(complex_graph, 1, 2, strategy='random')
+
+
+@pytest.mark.parametrize('engine', [pr.push_relabel_directed, prwd.push_relabel_directed])
+@pytest.mark.parametrize('s, t', [
+    ('a', 'b'),
+    ('a', 'e'),
+    ('c', 'f'),
+    ('d', 'e'),
+    ('f', 'b')
+])
+def test_push_relabel_directed_does_not_modify_graph(networkx_example_weighted_graph, engine, s, t):
+    G = networkx_example_weighted_graph.to_directed()
+    G2 = G.copy()
+
+    min_cut, (S, T) = engine(G, s, t)
+
+    assert nx.utils.graphs_equal(G, G2)
+    assert all(G.nodes[v] == G2.nodes[v] for v in G) and all(G.edges[e] == G2.edges[e] for e in G.edges)
+    assert (min_cut, (S, T)) == engine(G, s, t)
+    assert min_cut == minimum_cut(G, s, t)[0]
+
+
+@pytest.mark.parametrize('engine', [
+    lambda G, s, t, sink_side: pr.push_relabel_directed(G.to_directed(), s, t, sink_side),
+    lambda G, s, t, sink_side: prwd.push_relabel_directed(G.to_directed(), s, t, sink_side),
+    lambda G, s, t, sink_side: pr.push_relabel(G, s, t, sink_side=sink_side),
+    lambda G, s, t, sink_side: prwd.push_relabel(G, s, t, sink_side=sink_side)
+])
+def test_push_relabel_sink_side(engine):
+    G = nx.path_graph(4)
+    nx.set_edge_attributes(G, 1, 'capacity')
+
+    assert engine(G, 0, 3, False) == (1, ({0}, {1, 2, 3}))
+    assert engine(G, 0, 3, True) == (1, ({0, 1, 2}, {3}))
+
+
+@pytest.mark.parametrize('s, t', [
+    (1, 2),
+    (1, 3),
+    (2, 4),
+    (3, 1),
+    (4, 2)
+])
+def test_flow_network_both_sides(complex_graph, s, t):
+    N = FlowNetwork.from_networkx(complex_graph)
+
+    state = N.new_state()
+    min_cut, _ = pr.push_relabel_network(N, s, t, state=state)
+    source_mask, sink_mask = N.source_side(N.index[s], state[0]), N.sink_side(N.index[t], state[0])
+
+    assert N.cut_value(source_mask) == N.cut_value(sink_mask) == min_cut
+    assert all(inside <= outside for inside, outside in zip(source_mask, sink_mask))
+
+
+@pytest.mark.parametrize('engine', [pr.push_relabel, prwd.push_relabel])
+def test_push_relabel_infinite_capacities(engine):
+    G = nx.path_graph(4)
+    nx.set_edge_attributes(G, inf, 'capacity')
+    assert engine(G, 0, 3)[0] == inf
+
+    G[1][2]['capacity'] = 2
+    G.add_edge(0, 2, capacity=1)
+    min_cut, (S, T) = engine(G, 0, 3)
+    assert min_cut == minimum_cut(G, 0, 3)[0] == 3
+    assert (S, T) == ({0, 1}, {2, 3})
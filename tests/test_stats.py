@@ -0,0 +1,72 @@
+import pytest
+import src.push_relabel as pr
+import src.push_relabel_without_discharge as prwd
+import src.hao_orlin_original as ho
+import src.varizani_yannakakis as vy
+from src.cut_bases import canonical_greedy_cut_basis
+from src.stats import Stats
+
+
+def test_stats_merge():
+    stats = Stats()
+    stats.add('cuts', 2)
+    stats.maximum('queue_size', 3)
+    stats.add_time('queue', 0.5)
+    other = Stats()
+    other.add('cuts')
+    other.maximum('queue_size', 5)
+    other.add_time('queue', 0.25)
+    stats.merge(other)
+    stats.merge(other.as_dict())
+    assert stats.as_dict() == {'counts': {'cuts': 4}, 'maxima': {'queue_size': 5}, 'timings': {'queue': 1.0}}
+
+
+@pytest.mark.parametrize('engine', [pr.push_relabel, prwd.push_relabel])
+@pytest.mark.parametrize('s, t', [('a', 'f'), ('c', 'e'), ('f', 'b')])
+def test_push_relabel_stats(networkx_example_weighted_graph, engine, s, t):
+    stats = Stats()
+    assert engine(networkx_example_weighted_graph, s, t, stats) == engine(networkx_example_weighted_graph, s, t)
+    counts = stats.counts
+    assert counts['flow_calls'] == 1
+    assert counts['pushes'] > 0 and counts['relabels'] > 0
+    assert counts['saturating_pushes'] + counts['non_saturating_pushes'] == counts['pushes']
+
+
+@pytest.mark.parametrize('s', [1, 2, 3, 4])
+def test_hao_orlin_stats(complex_graph, s):
+    stats = Stats()
+    assert ho.hao_orlin(complex_graph, s, stats) == ho.hao_orlin(complex_graph, s)
+    counts = stats.counts
+    assert counts['flow_calls'] == 1
+    assert counts['saturating_pushes'] + counts['non_saturating_pushes'] == counts['pushes'] > 0
+
+
+@pytest.mark.parametrize('greedy', [False, True])
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'complex_graph', 'star_graph', 'networkx_example_weighted_graph'])
+def test_varizani_yannakakis_stats(request, graph, greedy):
+    G = request.getfixturevalue(graph)
+    emitted = []
+    stats = Stats(emitted.append)
+    cuts = vy.varizani_yannakakis(G, greedy, stats=stats)
+    assert [(cut.value, cut.st_partition) for cut in cuts] == [(cut.value, cut.st_partition) for cut in vy.varizani_yannakakis(G, greedy)]
+    assert emitted == [stats.as_dict()]
+    assert stats.counts['cuts'] >= len(cuts)
+    assert stats.counts['contractions'] > 0
+    assert stats.maxima['queue_size'] > 0
+    assert {'global_min_cut', 'collapse', 'max_flow', 'vector_conversion', 'queue'} <= set(stats.timings)
+    if greedy:
+        assert stats.counts['dependency_checks'] == stats.counts['cuts']
+
+
+def test_cut_basis_stats(complex_graph):
+    stats = Stats()
+    assert canonical_greedy_cut_basis(complex_graph.to_directed(), stats) == canonical_greedy_cut_basis(complex_graph.to_directed())
+    assert stats.counts['dependency_checks'] == stats.counts['cuts'] > 0
+
+
+def test_worker_stats_are_merged(networkx_example_weighted_graph):
+    serial, parallel = Stats(), Stats()
+    cuts = vy.varizani_yannakakis(networkx_example_weighted_graph, max_cuts=8, stats=serial)
+    assert [cut.value for cut in cuts] == [cut.value for cut in vy.varizani_yannakakis(networkx_example_weighted_graph, max_cuts=8, workers=2, stats=parallel)]
+    assert serial.counts == parallel.counts
+    assert serial.maxima == parallel.maxima
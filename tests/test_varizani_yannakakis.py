@@ -1,8 +1,13 @@
 import networkx as nx
+import itertools
 import pytest
+import random
 from math import inf
-from src.varizani_yannakakis import varizani_yannakakis, collapse_graph, Cut
-from src.cut_bases import cut_partition_to_edge_partition
+from src.varizani_yannakakis import varizani_yannakakis, iter_cuts, collapse_graph, collapse_network, get_immediate_children, vector_to_mask, mask_to_vector, cuts_to_array, array_to_cuts, global_min_cut, Cut, CutQueue
+from src.flow_network import FlowNetwork
+from src.cut_bases import cut_partition_to_edge_partition, edge_partition_to_vector, canonical_greedy_cut_basis
+from src.fast_gauss import has_dependent_rows
+from src.stats import Stats
 
 
 @pytest.mark.parametrize('graph, min_cut', [
@@ -14,7 +19,7 @@ from src.cut_bases import cut_partition_to_edge_partition
                         #('empty_graph', {'value': 0, 'st_partition': (set(), set())}), # TODO: raise an exception
                         #('disconnected_graph', {'value': 2, 'st_partition': (set(), set())}), # TODO: raise an exception?
                         #('unreachable_graph', {'value': 0, 'st_partition': (set(), set())}), # TODO: raise an exception?
-                        ('complex_graph', {'value': 6, 'st_partition': ({1, 4}, {2, 3})}),
+                        ('complex_graph', {'value': 6, 'st_partition': ({1}, {2, 3, 4})}),
                         ('star_graph', {'value': 1, 'st_partition': ({1, 2, 3}, {4})})
                         ])
 def test_yannakakis_best_cut(request, graph, min_cut):
@@ -30,7 +35,7 @@ def test_yannakakis_best_cut(request, graph, min_cut):
                         #('empty_graph', {'value': 0, 'st_partition': (set(), set())}), # TODO: raise an exception
                         #('disconnected_graph', {'value': 2, 'st_partition': (set(), set())}), # TODO: raise an exception?
                         #('unreachable_graph', {'value': 0, 'st_partition': (set(), set())}), # TODO: raise an exception?
-                        ('complex_graph', {'value': 6, 'st_partition': ({1}, {2, 3, 4})}),
+                        ('complex_graph', {'value': 6, 'st_partition': ({1, 4}, {2, 3})}),
                         ('star_graph', {'value': 10, 'st_partition': ({1, 2, 4}, {3})}),
                         #('star_graph', {'value': 10, 'st_partition': ({1}, {2, 3, 4})})
                         ])
@@ -40,6 +45,21 @@ def test_yannakakis_second_best_cut(request, graph, second_min_cut):
     assert cuts[1].st_partition == second_min_cut['st_partition']
 
 
+def test_yannakakis_brute_force_complex_graph(complex_graph):
+    cuts: list[Cut] = varizani_yannakakis(complex_graph, brute_force=True)
+    assert (cuts[0].value, cuts[0].st_partition) == (6, ({1, 4}, {2, 3}))
+    assert (cuts[1].value, cuts[1].st_partition) == (6, ({1}, {2, 3, 4}))
+    assert cut_partition_to_edge_partition(complex_graph, cuts[0].st_partition) == {(1, 2), (2, 4), (3, 4)}
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'single_edge_graph', 'single_node_graph', 'complex_graph', 'star_graph', 'networkx_example_weighted_graph', 'icl_weighted_graph'])
+def test_yannakakis_brute_force_same_values(request, graph):
+    G = request.getfixturevalue(graph)
+    values = [cut.value for cut in varizani_yannakakis(G)]
+    bf_values = [cut.value for cut in varizani_yannakakis(G, brute_force=True)]
+    assert values == bf_values
+
+
 @pytest.mark.parametrize('graph', ['undirected_triangle', 'single_edge_graph', 'single_node_graph', 'complex_graph', 'star_graph'])
 def test_yannakakis_non_decreasing_order(request, graph):
     cuts: list[Cut] = varizani_yannakakis(request.getfixturevalue(graph))
@@ -97,11 +117,293 @@ def test_collapse_graph_complex_graph(complex_graph):
                         #(empty_graph, 0), # TODO: raise an exception
                         #(disconnected_graph, 2), # TODO: raise an exception?
                         #(unreachable_graph, 0), # TODO: raise an exception?
-                        ('complex_graph', {(1, 2), (2, 4), (3, 4)}),
+                        ('complex_graph', {(1, 2), (1, 4)}),
                         ('star_graph', {(2,4)}),
                         #('star_graph', (10, ({1, 2, 4}, {3})))
                         ])
 def test_cut_partition_to_edge_partition(request, graph, edge_cut):
     cuts: list[Cut] = varizani_yannakakis(request.getfixturevalue(graph))
     min_edge_cut = cut_partition_to_edge_partition(request.getfixturevalue(graph), cuts[0].st_partition)
-    assert min_edge_cut == edge_cut
\ No newline at end of file
+    assert min_edge_cut == edge_cut
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'single_edge_graph', 'single_node_graph', 'complex_graph', 'star_graph'])
+def test_iter_cuts_matches_varizani_yannakakis(request, graph):
+    G = request.getfixturevalue(graph)
+    lazy_cuts = list(iter_cuts(G))
+    cuts = varizani_yannakakis(G)
+
+    assert [cut.value for cut in lazy_cuts] == [cut.value for cut in cuts]
+    assert [cut.st_partition for cut in lazy_cuts] == [cut.st_partition for cut in cuts]
+
+
+@pytest.mark.parametrize('max_cuts', [0, 1, 3, 100])
+def test_iter_cuts_max_cuts(networkx_example_weighted_graph, max_cuts):
+    G = networkx_example_weighted_graph
+    cuts = list(iter_cuts(G, max_cuts=max_cuts))
+
+    assert len(cuts) == min(max_cuts, len(varizani_yannakakis(G)))
+
+
+@pytest.mark.parametrize('max_value', [1, 6, 10])
+def test_iter_cuts_max_value(networkx_example_weighted_graph, max_value):
+    G = networkx_example_weighted_graph
+    cuts = list(iter_cuts(G, max_value=max_value))
+    expected = [cut.value for cut in varizani_yannakakis(G) if cut.value <= max_value]
+
+    assert [cut.value for cut in cuts] == expected
+
+
+def test_iter_cuts_is_lazy(networkx_example_weighted_graph, monkeypatch):
+    import src.varizani_yannakakis as vy_module
+    calls = []
+    original = vy_module.partly_specified_network_min_cut
+    monkeypatch.setattr(vy_module, 'partly_specified_network_min_cut', lambda *args: calls.append(args) or original(*args))
+
+    cuts = vy_module.iter_cuts(networkx_example_weighted_graph)
+    next(cuts)
+    assert calls == []
+    next(cuts)
+    assert len(calls) > 0
+
+
+@pytest.mark.parametrize('vector, mask', [
+    ('', (0, 0)),
+    ('0', (0, 1)),
+    ('1', (1, 1)),
+    ('001', (4, 3)),
+    ('110', (3, 3)),
+    ('0110', (6, 4))
+])
+def test_vector_mask_conversion(vector, mask):
+    assert vector_to_mask(vector) == mask
+    assert mask_to_vector(*mask) == vector
+
+
+@pytest.mark.parametrize('mother, leaf, children', [
+    ('0', '0110', ['0111', '010', '00']),
+    ('01', '0110', ['0111', '010']),
+    ('0110', '0110', []),
+    ('1', '1', [])
+])
+def test_get_immediate_children(mother, leaf, children):
+    immediate_children = get_immediate_children(vector_to_mask(mother), vector_to_mask(leaf))
+    assert [mask_to_vector(*child) for child in immediate_children] == children
+
+
+def test_collapse_graph_accepts_bitmask(complex_graph):
+    collapsed_graph = collapse_graph(complex_graph.to_directed(), vector_to_mask('110'))
+
+    assert collapsed_graph['S']['T']['capacity'] == 4
+    assert collapsed_graph['T'][4]['capacity'] == 8
+
+
+def test_collapse_graph_one_way_edges():
+    G = nx.DiGraph()
+    G.add_edge(1, 2, capacity=3)
+    G.add_edge(3, 2, capacity=1)
+    G.add_edge(3, 4, capacity=2)
+    collapsed_graph = collapse_graph(G, '01')
+
+    assert set(collapsed_graph.nodes) == {3, 4, 'S', 'T'}
+    assert collapsed_graph['S']['T']['capacity'] == 3
+    assert collapsed_graph[3]['T']['capacity'] == 1
+    assert not collapsed_graph.has_edge('T', 'S')
+
+
+@pytest.mark.parametrize('graph, mother', [
+    ('undirected_triangle', '001'),
+    ('complex_graph', '110'),
+    ('complex_graph', '01'),
+    ('networkx_example_weighted_graph', '0101'),
+    ('icl_weighted_graph', '1')
+])
+def test_collapse_network_matches_collapse_graph(request, graph, mother):
+    G = request.getfixturevalue(graph).to_directed()
+    collapsed_graph = collapse_graph(G, mother)
+    collapsed_network = collapse_network(FlowNetwork.from_networkx(G), mother)
+
+    assert collapsed_network.labels == list(collapsed_graph.nodes)
+    arcs = {}
+    for u in range(collapsed_network.n):
+        for a in range(collapsed_network.offsets[u], collapsed_network.offsets[u + 1]):
+            if collapsed_network.capacity[a] > 0:
+                arcs[collapsed_network.labels[u], collapsed_network.labels[collapsed_network.heads[a]]] = collapsed_network.capacity[a]
+    assert arcs == {(u, v): c for u, v, c in collapsed_graph.edges(data='capacity')}
+
+
+@pytest.mark.parametrize('pool', ['process', 'thread'])
+def test_yannakakis_workers(icl_weighted_graph, pool):
+    G = icl_weighted_graph
+    cuts = varizani_yannakakis(G)
+    parallel_cuts = varizani_yannakakis(G, workers=2, pool=pool)
+
+    assert [(cut.value, cut.st_partition) for cut in parallel_cuts] == [(cut.value, cut.st_partition) for cut in cuts]
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'single_edge_graph', 'complex_graph', 'star_graph', 'networkx_example_weighted_graph', 'icl_weighted_graph'])
+def test_greedy_cut_basis(request, graph):
+    G = request.getfixturevalue(graph)
+    basis = varizani_yannakakis(G, greedy=True)
+    assert len(basis) == G.number_of_nodes() - 1
+    assert [cut.value for cut in basis] == sorted(cut.value for cut in basis)
+
+    # The edge vectors of the basis are independent and span the edge vectors of all cuts
+    D = G.to_directed()
+    vectors = [edge_partition_to_vector(D, cut_partition_to_edge_partition(D, cut.st_partition)) for cut in basis]
+    assert not has_dependent_rows([[int(bit) for bit in vector] for vector in vectors])
+    assert canonical_greedy_cut_basis(D) == vectors
+
+
+def test_greedy_cut_basis_disconnected(disconnected_graph):
+    basis = varizani_yannakakis(disconnected_graph, greedy=True)
+    assert [cut.value for cut in basis] == [1, 2]
+    D = disconnected_graph.to_directed()
+    assert not has_dependent_rows([[int(bit) for bit in edge_partition_to_vector(D, cut_partition_to_edge_partition(D, cut.st_partition))] for cut in basis])
+    assert varizani_yannakakis(nx.Graph([(1, 2)]).subgraph([1]), greedy=True) == []
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'single_edge_graph', 'single_node_graph', 'complex_graph', 'star_graph', 'icl_weighted_graph'])
+def test_yannakakis_flow_network_input(request, graph):
+    G = request.getfixturevalue(graph)
+    from_graph = varizani_yannakakis(G)
+    from_network = varizani_yannakakis(FlowNetwork.from_networkx(G))
+    assert [(cut.value, cut.st_partition) for cut in from_network] == [(cut.value, cut.st_partition) for cut in from_graph]
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'complex_graph', 'star_graph', 'networkx_example_weighted_graph', 'icl_weighted_graph'])
+def test_yannakakis_lazy(request, graph):
+    G = request.getfixturevalue(graph)
+    cuts = varizani_yannakakis(G)
+    lazy_cuts = varizani_yannakakis(G, lazy=True)
+
+    assert [cut.value for cut in lazy_cuts] == [cut.value for cut in cuts]
+    assert sorted(cut.partition for cut in lazy_cuts) == sorted(cut.partition for cut in cuts)
+    assert [cut.value for cut in iter_cuts(G, max_cuts=4, lazy=True)] == [cut.value for cut in cuts[:4]]
+    assert [cut.value for cut in iter_cuts(G, max_value=cuts[2].value, lazy=True)] == [cut.value for cut in cuts if cut.value <= cuts[2].value]
+
+
+def test_yannakakis_lazy_saves_flow_calls(example_molecule):
+    G = example_molecule
+    eager, lazy = Stats(), Stats()
+    eager_values = [cut.value for cut in iter_cuts(G, max_cuts=3, stats=eager)]
+    lazy_values = [cut.value for cut in iter_cuts(G, max_cuts=3, stats=lazy, lazy=True)]
+
+    assert lazy_values == eager_values
+    assert 2 * lazy.counts['flow_calls'] < eager.counts['flow_calls']
+
+
+def test_yannakakis_lazy_workers(icl_weighted_graph):
+    with pytest.raises(ValueError):
+        varizani_yannakakis(icl_weighted_graph, lazy=True, workers=2)
+
+
+@pytest.mark.parametrize('graph', ['undirected_triangle', 'complex_graph', 'star_graph', 'networkx_example_weighted_graph'])
+def test_cut_record(request, graph):
+    D = request.getfixturevalue(graph).to_directed()
+    for cut, network_cut in zip(varizani_yannakakis(D), varizani_yannakakis(FlowNetwork.from_networkx(D))):
+        assert not hasattr(cut, '__dict__')
+        S, T = cut.st_partition
+        assert S | T == set(D.nodes) and not S & T
+        assert cut.partition_vector == ''.join('1' if node in T else '0' for node in D.nodes)
+        assert cut.edge_partition == network_cut.edge_partition == cut_partition_to_edge_partition(D, cut.st_partition)
+
+
+@pytest.mark.parametrize('graph', ['complex_graph', 'icl_weighted_graph'])
+def test_cuts_to_array(request, graph):
+    G = request.getfixturevalue(graph)
+    cuts = varizani_yannakakis(G)
+    packed = cuts_to_array(cuts, G.number_of_nodes())
+    unpacked = array_to_cuts(packed, cuts[0].labels)
+
+    assert packed.shape == (len(cuts),)
+    assert [(cut.value, cut.partition, cut.mother, cut.st_partition) for cut in unpacked] == [(cut.value, cut.partition, cut.mother, cut.st_partition) for cut in cuts]
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('max_cuts', [5, 20])
+def test_cut_queue_pruning(example_molecule, lazy, max_cuts):
+    G = example_molecule
+    stats = Stats()
+    cuts = [(cut.value, cut.partition) for cut in iter_cuts(G, max_cuts=max_cuts, lazy=lazy, stats=stats)]
+
+    assert cuts == [(cut.value, cut.partition) for cut in itertools.islice(iter_cuts(G, lazy=lazy), max_cuts)]
+    assert stats.counts['pruned_entries'] > 0
+
+
+@pytest.mark.parametrize('max_cuts', [None, 20])
+@pytest.mark.parametrize('graph', ['complex_graph', 'networkx_example_weighted_graph', 'icl_weighted_graph'])
+def test_cut_queue_spill(request, tmp_path, graph, max_cuts):
+    G = request.getfixturevalue(graph)
+    stats = Stats()
+    spilled = varizani_yannakakis(G, max_cuts=max_cuts, memory_limit=2, spill_dir=str(tmp_path), stats=stats)
+
+    assert [(cut.value, cut.st_partition) for cut in spilled] == [(cut.value, cut.st_partition) for cut in varizani_yannakakis(G, max_cuts=max_cuts)]
+    assert stats.counts['spilled_entries'] > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cut_queue_merges_runs(monkeypatch, tmp_path, example_molecule):
+    # Hundreds of spills under a small run limit: the run files are merged and never exceed the limit
+    monkeypatch.setattr(CutQueue, 'MAX_RUNS', 4)
+    open_runs = []
+    spill = CutQueue.spill
+    monkeypatch.setattr(CutQueue, 'spill', lambda queue: (spill(queue), open_runs.append((len(queue.runs), len(queue.run_heads)))))
+    stats = Stats()
+    spilled = [(cut.value, cut.partition) for cut in iter_cuts(example_molecule, max_cuts=300, memory_limit=20, spill_dir=str(tmp_path), stats=stats)]
+
+    assert spilled == [(cut.value, cut.partition) for cut in iter_cuts(example_molecule, max_cuts=300)]
+    assert len(open_runs) > 250 and stats.counts['run_merges'] > 50
+    assert max(max(counts) for counts in open_runs) <= 4
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize('options', [{}, {'lazy': True}, {'max_cuts': 30, 'memory_limit': 8}])
+def test_checkpoint_resume(tmp_path, example_molecule, options):
+    G = example_molecule
+    path = str(tmp_path / 'checkpoint.npz')
+    cuts = [(cut.value, cut.partition) for cut in itertools.islice(iter_cuts(G, **options), 30)]
+    stats = Stats()
+    interrupted = iter_cuts(G, checkpoint=path, checkpoint_cuts=4, stats=stats, **options)
+    assert [(cut.value, cut.partition) for cut in itertools.islice(interrupted, 10)] == cuts[:10]
+    interrupted.close()
+
+    # The last checkpoint was written before the 9th cut
+    assert stats.counts['checkpoints'] == 2
+    assert [(cut.value, cut.partition) for cut in itertools.islice(iter_cuts(G, resume_from=path, **options), 22)] == cuts[8:]
+
+
+def test_checkpoint_mismatch(tmp_path, complex_graph, star_graph):
+    path = str(tmp_path / 'checkpoint.npz')
+    for _ in iter_cuts(complex_graph, checkpoint=path, checkpoint_cuts=1):
+        pass
+
+    with pytest.raises(ValueError):
+        varizani_yannakakis(star_graph, resume_from=path)
+    with pytest.raises(ValueError):
+        varizani_yannakakis(complex_graph, lazy=True, resume_from=path)
+    # The last checkpoint was written before the last cut
+    assert [cut.value for cut in varizani_yannakakis(complex_graph, resume_from=path)] == [cut.value for cut in varizani_yannakakis(complex_graph)][-1:]
+
+
+def infinite_capacity_graph(seed):
+    G = nx.gnm_random_graph(7, 12, seed=seed)
+    rng = random.Random(seed)
+    for u, v in G.edges:
+        G[u][v]['capacity'] = inf if rng.random() < 0.2 else rng.randint(1, 5)
+    return G
+
+
+@pytest.mark.parametrize('seed', [101, 392] + list(range(20)))
+def test_infinite_capacities(seed):
+    G = infinite_capacity_graph(seed)
+    nodes = list(G.nodes)
+    sides = [set(S) for k in range(1, len(nodes)) for S in itertools.combinations(nodes, k)]
+    assert global_min_cut(G.to_directed())[0] == min(nx.cut_size(G, S, weight='capacity') for S in sides)
+
+    # The Edmonds-Karp sweep cannot handle infinite S-T paths
+    try:
+        cuts = varizani_yannakakis(G, brute_force=True)
+    except nx.NetworkXUnbounded:
+        return
+    for options in [{}, {'lazy': True}]:
+        assert [cut.value for cut in varizani_yannakakis(G, **options)] == [cut.value for cut in cuts]